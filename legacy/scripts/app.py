@@ -3,7 +3,7 @@
 from typing import List, Optional, Dict, Any
 from database.connection import db_manager
 from database.repositories import SourceNodeRepository
-from services.crawler_service import crawler_service
+from services.crawler_service import get_crawler_service
 from services.document_service import document_processor
 from services.llm_service import llm_service
 from entities.source_node import SourceNode, SourceStatus
@@ -152,14 +152,14 @@ class GraphBuilderApp:
                 return result["success"]
             
             # Start parallel crawling
-            crawl_stats = crawler_service.crawl_urls_parallel(
+            crawl_stats = get_crawler_service().crawl_urls_parallel(
                 start_urls=start_urls,
                 process_callback=process_url_callback,
                 max_workers=max_workers
             )
             
             # Get final statistics
-            crawler_stats = crawler_service.get_statistics()
+            crawler_stats = get_crawler_service().get_statistics()
             
             result = {
                 "success": True,
@@ -257,7 +257,7 @@ class GraphBuilderApp:
     def reset_crawler(self) -> Dict[str, Any]:
         """Reset crawler state."""
         try:
-            crawler_service.reset()
+            get_crawler_service().reset()
             return {"success": True, "message": "Crawler state reset successfully"}
         except Exception as e:
             logger.error(f"Failed to reset crawler: {e}")
@@ -33,8 +33,8 @@ class CrawlerConfig:
     max_workers: int = 5
     delay_between_requests: int = 1
     allowed_domains: list = None
-    visited_urls_file: str = "record/visited_urls.json"
-    processed_urls_file: str = "record/processed_urls.json"
+    visited_urls_file: str = "record/visited_urls.jsonl"
+    processed_urls_file: str = "record/processed_urls.jsonl"
 
 
 @dataclass
@@ -94,8 +94,8 @@ class Config:
             max_workers=int(os.getenv("MAX_WORKERS", "5")),
             delay_between_requests=int(os.getenv("CRAWL_DELAY", "1")),
             allowed_domains=os.getenv("ALLOWED_DOMAINS", "dfrobot").split(","),
-            visited_urls_file=os.getenv("VISITED_URLS_FILE", "record/visited_urls.json"),
-            processed_urls_file=os.getenv("PROCESSED_URLS_FILE", "record/processed_urls.json")
+            visited_urls_file=os.getenv("VISITED_URLS_FILE", "record/visited_urls.jsonl"),
+            processed_urls_file=os.getenv("PROCESSED_URLS_FILE", "record/processed_urls.jsonl")
         )
     
     def _load_processing_config(self) -> ProcessingConfig:
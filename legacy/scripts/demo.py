@@ -16,7 +16,7 @@ sys.path.insert(0, str(project_root))
 from app import app
 from config import config
 from logger_config import setup_logging, logger
-from services.crawler_service import crawler_service
+from services.crawler_service import get_crawler_service
 from utils.helpers import save_json_data, format_timestamp
 from utils.validators import URLValidator
 
@@ -75,12 +75,12 @@ def demo_crawler_service():
     print("🕷️ CRAWLER SERVICE DEMO")
     print("="*60)
     
-    stats = crawler_service.get_statistics()
+    stats = get_crawler_service().get_statistics()
     print(f"Crawler Statistics: {stats}")
     
     # Test URL validation
     test_url = "https://www.dfrobot.com"
-    should_process = crawler_service.should_process_url(test_url)
+    should_process = get_crawler_service().should_process_url(test_url)
     print(f"Should process {test_url}: {should_process}")
 
 
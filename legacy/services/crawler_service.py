@@ -1,80 +1,221 @@
 """Web crawler service for extracting content from URLs."""
 
 import json
+import os
 import time
-from queue import Queue
+from queue import Empty, Queue
 from threading import Lock
 from typing import Set, List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urljoin, urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 
 from config import config
 from exceptions import CrawlerError
 from logger_config import logger
 
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# lxml's C parser is several times faster than the pure-Python html.parser
+HTML_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+# hrefs that never lead to a crawlable page, rejected before any URL parsing
+SKIPPED_HREF_PREFIXES = ('#', 'mailto:', 'javascript:', 'tel:')
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` requests per second, in bursts of up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.timestamp = time.monotonic()
+        self.lock = Lock()
+    
+    def reserve(self) -> float:
+        """
+        Take a token and return how many seconds the caller must wait before using it.
+        
+        Tokens may be borrowed ahead, so callers sleep outside the lock and the
+        bucket never blocks other threads.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+            self.timestamp = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
 
 class WebCrawlerService:
     """Service for web crawling and URL processing."""
     
+    # Processed URLs between full rewrites of the URL journals
+    SNAPSHOT_INTERVAL = 100
+    
     def __init__(self):
         self.visited_lock = Lock()
         self.visited: Set[str] = set()
         self.processed_urls: Set[str] = set()
         self.url_queue = Queue()
+        self._queued_urls: Set[str] = set()
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._host_buckets_lock = Lock()
         self.session = requests.Session()
+        self._visited_journal = None
+        self._processed_journal = None
+        self._processed_since_snapshot = 0
+        
+        # Allowed domains match the host itself or any subdomain of it; names
+        # without a dot (such as the default "dfrobot") match any label of the host
+        allowed_domains = [
+            domain.strip().lower().lstrip('.')
+            for domain in config.crawler.allowed_domains or []
+            if domain.strip()
+        ]
+        self._allowed_hosts = frozenset(domain for domain in allowed_domains if '.' in domain)
+        self._allowed_suffixes = tuple('.' + domain for domain in self._allowed_hosts)
+        self._allowed_labels = frozenset(domain for domain in allowed_domains if '.' not in domain)
         
         # Configure session
         self.session.headers.update({
             'User-Agent': 'GraphBuilder/1.0 (+https://github.com/VincentPit/GraphBuilder)'
         })
         
-        # Load existing data
-        self._load_url_data()
+        # Size the connection pool for the worker threads so they don't queue
+        # on the default 10 connections, and retry transient server errors
+        pool_size = config.crawler.max_workers * 2
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Load existing data and compact it into fresh journals
+        self._state_loaded = self._load_url_data()
+        self.flush_snapshot()
+    
+    @staticmethod
+    def _read_url_file(path: Path) -> Set[str]:
+        """Read a JSON Lines URL journal; JSON array files from older versions are also accepted."""
+        if not path.exists():
+            path = path.with_suffix('.json')
+            if not path.exists():
+                return set()
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read(1) == '[':
+                f.seek(0)
+                return set(json.load(f))
+            f.seek(0)
+            lines = [line for line in f if line.strip()]
+        
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        urls = set()
+        for index, line in enumerate(lines):
+            try:
+                urls.add(loads(line))
+            except ValueError:
+                # Journals are buffered, so a crash can cut off the last line
+                if index != len(lines) - 1:
+                    raise
+                logger.warning(f"Skipping truncated last line in {path}")
+        return urls
     
-    def _load_url_data(self) -> None:
-        """Load visited and processed URLs from files."""
+    def _load_url_data(self) -> bool:
+        """Load visited and processed URLs from files; returns False if loading failed."""
         try:
-            visited_file = Path(config.crawler.visited_urls_file)
-            if visited_file.exists():
-                with open(visited_file, 'r', encoding='utf-8') as f:
-                    self.visited = set(json.load(f))
-                    logger.info(f"Loaded {len(self.visited)} visited URLs")
+            self.visited = self._read_url_file(Path(config.crawler.visited_urls_file))
+            logger.info(f"Loaded {len(self.visited)} visited URLs")
             
-            processed_file = Path(config.crawler.processed_urls_file)
-            if processed_file.exists():
-                with open(processed_file, 'r', encoding='utf-8') as f:
-                    self.processed_urls = set(json.load(f))
-                    logger.info(f"Loaded {len(self.processed_urls)} processed URLs")
+            self.processed_urls = self._read_url_file(Path(config.crawler.processed_urls_file))
+            logger.info(f"Loaded {len(self.processed_urls)} processed URLs")
+            return True
         
         except Exception as e:
             logger.error(f"Failed to load URL data: {e}")
             # Continue with empty sets
+            return False
     
-    def _save_url_data(self) -> None:
-        """Save visited and processed URLs to files."""
-        try:
-            # Ensure directories exist
+    def _close_journals(self) -> None:
+        """Close the append-only URL journals."""
+        for journal in (self._visited_journal, self._processed_journal):
+            if journal:
+                journal.close()
+        self._visited_journal = None
+        self._processed_journal = None
+    
+    def flush_snapshot(self) -> None:
+        """
+        Rewrite the URL journals from the in-memory sets and reopen them for appending.
+        
+        Between snapshots each visited or processed URL is appended as one JSON
+        line, so saving state costs O(1) per URL instead of a full rewrite.
+        If loading the stored URLs failed, the journals are only flushed and
+        appended to, so the in-memory sets never overwrite state they lack.
+        """
+        with self.visited_lock:
+            if not self._state_loaded:
+                if self._visited_journal and self._processed_journal:
+                    self._visited_journal.flush()
+                    self._processed_journal.flush()
+                else:
+                    self._open_journals_locked()
+                self._processed_since_snapshot = 0
+                return
+            
+            self._close_journals()
             visited_file = Path(config.crawler.visited_urls_file)
             processed_file = Path(config.crawler.processed_urls_file)
             
-            visited_file.parent.mkdir(parents=True, exist_ok=True)
-            processed_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Save visited URLs
-            with open(visited_file, 'w', encoding='utf-8') as f:
-                json.dump(list(self.visited), f, ensure_ascii=False, indent=2)
+            try:
+                for path, urls in ((visited_file, self.visited), (processed_file, self.processed_urls)):
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = path.with_name(path.name + '.tmp')
+                    if ORJSON_AVAILABLE:
+                        with open(tmp_path, 'wb') as f:
+                            f.writelines(orjson.dumps(url) + b'\n' for url in urls)
+                    else:
+                        with open(tmp_path, 'w', encoding='utf-8') as f:
+                            f.writelines(json.dumps(url, ensure_ascii=False) + '\n' for url in urls)
+                    os.replace(tmp_path, path)
+                
+                self._processed_since_snapshot = 0
+                logger.debug("URL data saved successfully")
             
-            # Save processed URLs
-            with open(processed_file, 'w', encoding='utf-8') as f:
-                json.dump(list(self.processed_urls), f, ensure_ascii=False, indent=2)
+            except Exception as e:
+                logger.error(f"Failed to save URL data: {e}")
             
-            logger.debug("URL data saved successfully")
-        
+            self._open_journals_locked()
+    
+    def _open_journals_locked(self) -> None:
+        """Open the URL journals for appending; the caller holds visited_lock."""
+        try:
+            visited_file = Path(config.crawler.visited_urls_file)
+            processed_file = Path(config.crawler.processed_urls_file)
+            visited_file.parent.mkdir(parents=True, exist_ok=True)
+            processed_file.parent.mkdir(parents=True, exist_ok=True)
+            self._visited_journal = open(visited_file, 'a', encoding='utf-8', buffering=1 << 16)
+            self._processed_journal = open(processed_file, 'a', encoding='utf-8', buffering=1 << 16)
         except Exception as e:
-            logger.error(f"Failed to save URL data: {e}")
+            logger.error(f"Failed to open URL journals: {e}")
     
     def extract_links(self, url: str) -> List[str]:
         """
@@ -92,15 +233,24 @@ class WebCrawlerService:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Hand over raw bytes so the parser does the encoding detection itself
+            soup = BeautifulSoup(response.content, HTML_PARSER)
             links = []
+            seen_hrefs = set()
             
             for a_tag in soup.find_all('a', href=True):
                 href = a_tag.get('href')
-                if href:
-                    absolute_url = urljoin(url, href)
-                    if self._is_valid_url(absolute_url):
-                        links.append(absolute_url)
+                # Navigation links repeat on every page, so each href is resolved once
+                if not href or href in seen_hrefs:
+                    continue
+                seen_hrefs.add(href)
+                
+                if href.startswith(SKIPPED_HREF_PREFIXES):
+                    continue
+                
+                absolute_url = urljoin(url, href)
+                if self._is_valid_url_parsed(urlparse(absolute_url)):
+                    links.append(absolute_url)
             
             logger.debug(f"Extracted {len(links)} links from {url}")
             return links
@@ -115,16 +265,25 @@ class WebCrawlerService:
     def _is_valid_url(self, url: str) -> bool:
         """Check if URL is valid and should be processed."""
         try:
-            parsed = urlparse(url)
-            
+            return self._is_valid_url_parsed(urlparse(url))
+        except Exception:
+            return False
+    
+    def _is_valid_url_parsed(self, parsed) -> bool:
+        """Check an already parsed URL; see _is_valid_url."""
+        try:
             # Must have scheme and netloc
             if not parsed.scheme or not parsed.netloc:
                 return False
             
             # Check allowed domains
-            domain = parsed.netloc.lower()
-            if config.crawler.allowed_domains:
-                return any(allowed_domain in domain for allowed_domain in config.crawler.allowed_domains)
+            if self._allowed_hosts or self._allowed_labels:
+                domain = parsed.hostname or ''
+                return (
+                    domain in self._allowed_hosts
+                    or domain.endswith(self._allowed_suffixes)
+                    or not self._allowed_labels.isdisjoint(domain.split('.'))
+                )
             
             return True
         
@@ -134,43 +293,77 @@ class WebCrawlerService:
     def should_process_url(self, url: str) -> bool:
         """Check if URL should be processed."""
         with self.visited_lock:
-            # Skip if already visited or processed
-            if url in self.visited or url in self.processed_urls:
-                return False
-            
-            # Check crawl limit
-            if len(self.processed_urls) >= config.crawler.max_crawl_limit:
-                logger.info(f"Crawl limit reached: {config.crawler.max_crawl_limit}")
-                return False
-            
-            # Check if URL matches allowed domains
-            if not self._is_valid_url(url):
-                logger.debug(f"URL not valid for processing: {url}")
-                return False
-            
-            return True
+            return self._should_process_url_locked(url)
+    
+    def _should_process_url_locked(self, url: str) -> bool:
+        """should_process_url for callers already holding visited_lock."""
+        # Skip if already visited or processed
+        if url in self.visited or url in self.processed_urls:
+            return False
+        
+        # Check crawl limit
+        if len(self.processed_urls) >= config.crawler.max_crawl_limit:
+            logger.info(f"Crawl limit reached: {config.crawler.max_crawl_limit}")
+            return False
+        
+        # Check if URL matches allowed domains
+        if not self._is_valid_url(url):
+            logger.debug(f"URL not valid for processing: {url}")
+            return False
+        
+        return True
     
     def mark_url_visited(self, url: str) -> None:
         """Mark URL as visited."""
         with self.visited_lock:
-            self.visited.add(url)
+            self._mark_url_visited_locked(url)
+    
+    def _mark_url_visited_locked(self, url: str) -> None:
+        self.visited.add(url)
+        if self._visited_journal:
+            self._visited_journal.write(json.dumps(url, ensure_ascii=False) + '\n')
+    
+    def claim_url(self, url: str) -> bool:
+        """
+        Mark URL as visited if it should be processed, and report whether it was.
+        
+        The check and the mark happen under one lock acquisition, so two workers
+        that pulled the same URL from the queue cannot both process it.
+        """
+        with self.visited_lock:
+            self._queued_urls.discard(url)
+            if not self._should_process_url_locked(url):
+                return False
+            self._mark_url_visited_locked(url)
+            return True
     
     def mark_url_processed(self, url: str) -> None:
         """Mark URL as processed."""
         with self.visited_lock:
             self.processed_urls.add(url)
-        self._save_url_data()
+            if self._processed_journal:
+                self._processed_journal.write(json.dumps(url, ensure_ascii=False) + '\n')
+            self._processed_since_snapshot += 1
+            snapshot_due = self._processed_since_snapshot >= self.SNAPSHOT_INTERVAL
+        
+        if snapshot_due:
+            self.flush_snapshot()
     
     def add_urls_to_queue(self, urls: List[str]) -> int:
         """Add URLs to processing queue."""
-        added_count = 0
+        # URLs already waiting in the queue are not queued again; one lock
+        # acquisition covers the whole page's links
+        with self.visited_lock:
+            new_urls = [
+                url for url in dict.fromkeys(urls)
+                if url not in self._queued_urls and self._should_process_url_locked(url)
+            ]
+            self._queued_urls.update(new_urls)
         
-        for url in urls:
-            if self.should_process_url(url):
-                self.url_queue.put(url)
-                added_count += 1
+        for url in new_urls:
+            self.url_queue.put(url)
         
-        return added_count
+        return len(new_urls)
     
     def crawl_urls_parallel(
         self,
@@ -203,63 +396,89 @@ class WebCrawlerService:
             'skipped_count': 0
         }
         
+        stats_lock = Lock()
+        
+        # Long-lived workers each pull their own URLs, so a slow page no longer
+        # holds up a whole batch
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Process URLs from queue
-            while not self.url_queue.empty() and len(self.processed_urls) < config.crawler.max_crawl_limit:
-                # Get batch of URLs
-                batch_urls = []
-                batch_size = min(max_workers, self.url_queue.qsize())
-                
-                for _ in range(batch_size):
-                    if not self.url_queue.empty():
-                        batch_urls.append(self.url_queue.get())
-                
-                if not batch_urls:
-                    break
-                
-                # Submit processing tasks
-                future_to_url = {
-                    executor.submit(self._process_url_with_callback, url, process_callback): url
-                    for url in batch_urls
-                }
+            workers = [
+                executor.submit(self._worker_loop, process_callback, stats, stats_lock)
+                for _ in range(max_workers)
+            ]
+            for worker in workers:
+                worker.result()
+        
+        self.flush_snapshot()
+        logger.info(f"Crawling completed. Stats: {stats}")
+        return stats
+    
+    def _worker_loop(self, process_callback: callable, stats: Dict[str, int], stats_lock: Lock) -> None:
+        """
+        Process URLs from the queue until the crawl limit is reached or the crawl is finished.
+        
+        The crawl is finished when the queue has no unfinished tasks: a URL is only
+        marked done after its extracted links have been queued, so no worker can
+        stop while another is still able to produce work.
+        """
+        while len(self.processed_urls) < config.crawler.max_crawl_limit:
+            try:
+                url = self.url_queue.get(timeout=1)
+            except Empty:
+                if self.url_queue.unfinished_tasks == 0:
+                    return
+                continue
+            
+            try:
+                self._wait_for_host(url)
+                success = self._process_url_with_callback(url, process_callback)
                 
-                # Collect results and extract new links
-                for future in as_completed(future_to_url):
-                    url = future_to_url[future]
+                if success:
+                    with stats_lock:
+                        stats['processed_count'] += 1
                     
-                    try:
-                        success = future.result()
-                        
-                        if success:
-                            stats['processed_count'] += 1
-                            
-                            # Extract new links and add to queue
-                            if len(self.processed_urls) < config.crawler.max_crawl_limit:
-                                new_links = self.extract_links(url)
-                                added_count = self.add_urls_to_queue(new_links)
-                                if added_count > 0:
-                                    logger.debug(f"Added {added_count} new URLs from {url}")
-                        else:
-                            stats['failed_count'] += 1
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing URL {url}: {e}")
+                    # Extract new links and add to queue
+                    if len(self.processed_urls) < config.crawler.max_crawl_limit:
+                        new_links = self.extract_links(url)
+                        added_count = self.add_urls_to_queue(new_links)
+                        if added_count > 0:
+                            logger.debug(f"Added {added_count} new URLs from {url}")
+                else:
+                    with stats_lock:
                         stats['failed_count'] += 1
-                
-                # Rate limiting
-                if config.crawler.delay_between_requests > 0:
-                    time.sleep(config.crawler.delay_between_requests)
+            
+            except Exception as e:
+                logger.error(f"Error processing URL {url}: {e}")
+                with stats_lock:
+                    stats['failed_count'] += 1
+            
+            finally:
+                self.url_queue.task_done()
+    
+    def _wait_for_host(self, url: str) -> None:
+        """
+        Rate-limit requests per host to one per delay_between_requests.
         
-        logger.info(f"Crawling completed. Stats: {stats}")
-        return stats
+        Only workers on the same host wait for each other; a worker that has
+        just finished a page moves straight on to a URL of another host.
+        """
+        delay = config.crawler.delay_between_requests
+        if delay <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._host_buckets_lock:
+            bucket = self._host_buckets.get(host)
+            if bucket is None:
+                bucket = self._host_buckets[host] = TokenBucket(1.0 / delay)
+        wait = bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
     
     def _process_url_with_callback(self, url: str, process_callback: callable) -> bool:
         """Process URL with callback function."""
         try:
-            if not self.should_process_url(url):
+            if not self.claim_url(url):
                 return False
             
-            self.mark_url_visited(url)
             logger.info(f"Processing URL: {url}")
             
             # Call the processing callback
@@ -288,17 +507,28 @@ class WebCrawlerService:
         with self.visited_lock:
             self.visited.clear()
             self.processed_urls.clear()
+            self._queued_urls.clear()
             
             # Clear queue
             while not self.url_queue.empty():
                 try:
                     self.url_queue.get_nowait()
+                    self.url_queue.task_done()
                 except:
                     break
         
-        self._save_url_data()
+        self.flush_snapshot()
         logger.info("Crawler state reset")
 
 
-# Global crawler service instance
-crawler_service = WebCrawlerService()
\ No newline at end of file
+# Global crawler service instance, created on first use so that importing
+# this module does not load the URL records or open the journals
+_crawler_service: Optional[WebCrawlerService] = None
+
+
+def get_crawler_service() -> WebCrawlerService:
+    """Return the global crawler service, creating it on first call."""
+    global _crawler_service
+    if _crawler_service is None:
+        _crawler_service = WebCrawlerService()
+    return _crawler_service
\ No newline at end of file
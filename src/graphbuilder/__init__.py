@@ -15,10 +15,15 @@ __description__ = "Enterprise Knowledge Graph Construction Platform"
 __author__ = "GraphBuilder Team"
 __license__ = "MIT"
 
-# Core exports
-from graphbuilder.core.entities import *
-from graphbuilder.application.use_cases import *
-from graphbuilder.infrastructure.config import GraphBuilderConfig
+
+def __getattr__(name):
+    # Resolved lazily (PEP 562) so that ``import graphbuilder`` does not pull in
+    # the configuration stack and its database/LLM dependencies.
+    if name == "GraphBuilderConfig":
+        from graphbuilder.infrastructure.config import GraphBuilderConfig
+        return GraphBuilderConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "GraphBuilderConfig",
@@ -31,14 +31,19 @@ MERGED_DIR = os.path.join(os.path.dirname(__file__), "data")
 file_name = "/home/dfrobot/ljy/GraphBuilder/data/sample.json"
 
 
-graph = create_graph_database_connection(uri, userName, password, database)   
+def main():
+    graph = create_graph_database_connection(uri, userName, password, database)
 
-graphDb_data_Access = graphDBdataAccess(graph)
+    graphDb_data_Access = graphDBdataAccess(graph)
 
-merged_file_path = os.path.join(MERGED_DIR,file_name)
-logging.info(f'File path:{merged_file_path}')
+    merged_file_path = os.path.join(MERGED_DIR,file_name)
+    logging.info(f'File path:{merged_file_path}')
 
-success_count,failed_count = create_source_node_graph_json(graph, model, file_name)
+    success_count,failed_count = create_source_node_graph_json(graph, model, file_name)
 
 
-result = extract_graph_from_file_local_file(graph, model, merged_file_path, file_name, allowedNodes, allowedRelationship)
+    result = extract_graph_from_file_local_file(graph, model, merged_file_path, file_name, allowedNodes, allowedRelationship)
+
+
+if __name__ == "__main__":
+    main()
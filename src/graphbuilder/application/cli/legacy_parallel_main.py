@@ -13,7 +13,9 @@ from multiprocessing import Manager, Pool
 import logging
 import json
 import os
-from graphbuilder.infrastructure.database.neo4j_client import graphDBdataAccess
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
 from graphbuilder.core.processing.processor import create_source_node_graph_dfrobot_url, extract_graph_from_web_page
 from graphbuilder.core.utils.common_functions import create_graph_database_connection
 
@@ -26,6 +28,40 @@ PROCESSED_FILE = 'record/processed_urls.json'
 
 # Settings
 MAX_CRAWL_LIMIT = 200  # Limit the number of URLs to crawl
+POLITE_DELAY = 1  # Seconds between requests to the same host
+SAVE_INTERVAL = 30  # Seconds between saves of the visited and processed URLs
+
+# Neo4j connection settings
+URI = "bolt://localhost:7687"
+USER = "neo4j"
+PASSWORD = "neo4j"
+DATABASE = "neo4j"
+
+# Per-process graph connection, created once by the pool initializer
+_GRAPH = None
+
+# Per-process last fetch time per host; each host is owned by a single worker
+_LAST_FETCH = {}
+
+def init_worker():
+    """Open one graph connection per worker process."""
+    global _GRAPH
+    _GRAPH = create_graph_database_connection(URI, USER, PASSWORD, DATABASE)
+
+def wait_for_host(url):
+    """Sleep until POLITE_DELAY has passed since the last fetch from url's host."""
+    host = urlsplit(url).hostname
+    delay = _LAST_FETCH.get(host, 0) + POLITE_DELAY - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    _LAST_FETCH[host] = time.monotonic()
+
+def partition_urls_by_host(urls, num_workers):
+    """Group URLs so that every host is handled by exactly one worker."""
+    buckets = defaultdict(list)
+    for url in urls:
+        buckets[hash(urlsplit(url).hostname) % num_workers].append(url)
+    return list(buckets.values())
 
 # Load visited and processed URLs from file
 def load_visited_and_processed():
@@ -39,46 +75,38 @@ def load_visited_and_processed():
             processed_urls = set(json.load(f))
     return visited, processed_urls
 
-# Save visited and processed URLs to file
+# Save visited and processed URLs to file; only the parent process saves, and
+# each file is replaced atomically so an interrupted save never corrupts it
 def save_visited_and_processed(visited, processed_urls):
-    with open(VISITED_FILE, 'w') as f:
-        json.dump(list(visited), f)
-    with open(PROCESSED_FILE, 'w') as f:
-        json.dump(list(processed_urls), f)
+    for path, urls in ((VISITED_FILE, visited), (PROCESSED_FILE, processed_urls)):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(list(urls.keys()), f)
+        os.replace(tmp_path, path)
 
 def process_url(model, allowed_nodes, allowed_relationship, url, visited, processed_urls):
     """Crawl and process a single URL."""
     if url in visited or url in processed_urls:
         return
-    visited.add(url)
+    visited[url] = 1
 
     if 'dfrobot' not in url:
         logging.info(f"Skipping URL without keyword: {url}")
         return
 
     logging.info(f"Processing: {url}")
-    
-    # Create a new graph connection in the worker
-    uri = "bolt://localhost:7687"
-    userName = "neo4j"
-    password = "neo4j"
-    database = "neo4j"
-    graph = create_graph_database_connection(uri, userName, password, database)
-    graphDb_data_Access = graphDBdataAccess(graph)
+    wait_for_host(url)
 
     # First, process the source node graph for this URL
-    lst_file, success_count, fail_count = create_source_node_graph_dfrobot_url(graph, model, url, "dfrobot")
+    lst_file, success_count, fail_count = create_source_node_graph_dfrobot_url(_GRAPH, model, url, "dfrobot")
     logging.info(f"Processed source node for {url}: Success: {success_count}, Failures: {fail_count}")
 
     # Then, extract the graph from the page
-    result_dic = extract_graph_from_web_page(graph, model, url, allowed_nodes, allowed_relationship)
+    result_dic = extract_graph_from_web_page(_GRAPH, model, url, allowed_nodes, allowed_relationship)
     logging.info(f"Extracted graph data from {url}: {result_dic}")
 
-    # Add to processed URLs
-    processed_urls.add(url)
-
-    # Save visited and processed after processing each URL to avoid losing progress
-    save_visited_and_processed(visited, processed_urls)
+    # Add to processed URLs; the parent saves them periodically
+    processed_urls[url] = 1
 
 def worker(model, allowed_nodes, allowed_relationship, urls_chunk, visited, processed_urls):
     """Worker function to process a chunk of URLs."""
@@ -86,26 +114,30 @@ def worker(model, allowed_nodes, allowed_relationship, urls_chunk, visited, proc
         process_url(model, allowed_nodes, allowed_relationship, url, visited, processed_urls)
 
 def main(urls, model, allowed_nodes, allowed_relationship):
-    # Split the URLs into chunks for parallel processing
+    # Split the URLs into per-host chunks for parallel processing
     num_workers = 50
-    
-    
-    chunk_size = len(urls) // num_workers
-    url_chunks = [urls[i:i + chunk_size] for i in range(0, len(urls), chunk_size)]
+    url_chunks = partition_urls_by_host(urls, num_workers)
 
-    # Create a multiprocessing Manager to share visited and processed sets
+    # Create a multiprocessing Manager to share visited and processed sets.
+    # Manager dicts are used as sets: wrapping a proxy in set() would give each
+    # worker its own local copy and dedup across workers would silently break.
     with Manager() as manager:
-        visited = set(manager.list()) 
-        processed_urls = set(manager.list())  
+        visited = manager.dict()
+        processed_urls = manager.dict()
 
         # Load previously visited and processed URLs if they exist
         loaded_visited, loaded_processed = load_visited_and_processed()
-        visited.update(loaded_visited)  # Use update to add elements to a set
-        processed_urls.update(loaded_processed)  # Use update to add elements to a set
+        visited.update(dict.fromkeys(loaded_visited, 1))
+        processed_urls.update(dict.fromkeys(loaded_processed, 1))
 
         # Create a pool of workers
-        with Pool(processes=num_workers) as pool:
-            pool.starmap(worker, [(model, allowed_nodes, allowed_relationship, chunk, visited, processed_urls) for chunk in url_chunks])
+        with Pool(processes=min(num_workers, len(url_chunks)) or 1, initializer=init_worker) as pool:
+            result = pool.starmap_async(worker, [(model, allowed_nodes, allowed_relationship, chunk, visited, processed_urls) for chunk in url_chunks])
+            # Save progress every SAVE_INTERVAL seconds while the workers run
+            while not result.ready():
+                result.wait(SAVE_INTERVAL)
+                save_visited_and_processed(visited, processed_urls)
+            result.get()
 
         # After processing all URLs, save the visited and processed data
         save_visited_and_processed(visited, processed_urls)
@@ -21,7 +21,6 @@ from graphbuilder.infrastructure.database.neo4j_client import graphDBdataAccess
 from graphbuilder.core.processing.processor import create_source_node_graph_dfrobot_url, extract_graph_from_web_page
 from graphbuilder.core.utils.common_functions import create_graph_database_connection
 
-logging.basicConfig(level=logging.INFO)
 #To Be Modified
 uri = "bolt://localhost:7687"
 userName = "neo4j"
@@ -37,17 +36,23 @@ MERGED_DIR = os.path.join(os.path.dirname(__file__), "data")
 file_name = "/home/dfrobot/ljy/GraphBuilder/data/sample.json"
 
 
-graph = create_graph_database_connection(uri, userName, password, database)   
+def main():
+    logging.basicConfig(level=logging.INFO)
+    graph = create_graph_database_connection(uri, userName, password, database)
 
-graphDb_data_Access = graphDBdataAccess(graph)
+    graphDb_data_Access = graphDBdataAccess(graph)
 
-merged_file_path = os.path.join(MERGED_DIR,file_name)
-logging.info(f'File path:{merged_file_path}')
-url = "https://wiki.dfrobot.com.cn/"
-# First, process the source node graph for this URL
-lst_file, success_count, fail_count = create_source_node_graph_dfrobot_url(graph, model, url, "dfrobot")
-logging.info(f"Processed source node for {url}: Success: {success_count}, Failures: {fail_count}")
+    merged_file_path = os.path.join(MERGED_DIR,file_name)
+    logging.info(f'File path:{merged_file_path}')
+    url = "https://wiki.dfrobot.com.cn/"
+    # First, process the source node graph for this URL
+    lst_file, success_count, fail_count = create_source_node_graph_dfrobot_url(graph, model, url, "dfrobot")
+    logging.info(f"Processed source node for {url}: Success: {success_count}, Failures: {fail_count}")
 
-# Then, extract the graph from the page
-result_dic = extract_graph_from_web_page(graph, model, url, allowedNodes, allowedRelationships)
-logging.info(f"Extracted graph data from {url}: {result_dic}")
+    # Then, extract the graph from the page
+    result_dic = extract_graph_from_web_page(graph, model, url, allowedNodes, allowedRelationships)
+    logging.info(f"Extracted graph data from {url}: {result_dic}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,126 +10,643 @@ New Location: src/graphbuilder/application/cli/legacy_url_main.py
 """
 
 import os
+import sys
 import json
+import functools
+import atexit
+import hashlib
+import sqlite3
+from array import array
 import logging
+import asyncio
+import heapq
 import time
-from queue import Queue
+from collections import Counter, defaultdict, deque
 from concurrent.futures import ThreadPoolExecutor
-from threading import Lock
-import requests
+import aiohttp
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode, unquote
 from graphbuilder.infrastructure.database.neo4j_client import graphDBdataAccess
-from graphbuilder.core.processing.processor import create_source_node_graph_dfrobot_url, extract_graph_from_web_page
+from graphbuilder.core.processing.processor import create_source_nodes_graph_dfrobot_urls, extract_graph_from_web_pages
 from graphbuilder.core.utils.common_functions import create_graph_database_connection
-from concurrent.futures import wait
+
+try:
+    from selectolax.parser import HTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    from pybloomfilter import BloomFilter
+    BLOOMFILTER_AVAILABLE = True
+except ImportError:
+    BLOOMFILTER_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 
+class UrlFingerprintSet:
+    """
+    Set of URLs kept as 64-bit BLAKE2b fingerprints rather than strings, at
+    a fraction of the memory per URL. Two URLs share a fingerprint with
+    negligible probability at crawl scale (about 1e-5 for 10M URLs).
+    """
+
+    def __init__(self, fingerprints=()):
+        self._fingerprints = set(fingerprints)
+
+    @staticmethod
+    def fingerprint(url):
+        return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), 'little')
+
+    def __contains__(self, url):
+        return self.fingerprint(url) in self._fingerprints
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def add(self, url):
+        self._fingerprints.add(self.fingerprint(url))
+
+    def update(self, urls):
+        self._fingerprints.update(map(self.fingerprint, urls))
+
+    def update_from_bytes(self, data):
+        fingerprints = array('Q')
+        # A crash can leave a partial fingerprint at the end of a log
+        fingerprints.frombytes(data[:len(data) - len(data) % fingerprints.itemsize])
+        self._fingerprints.update(fingerprints)
+
+    def to_bytes(self):
+        return array('Q', self._fingerprints).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        fingerprints = cls()
+        fingerprints.update_from_bytes(data)
+        return fingerprints
+
+class SimHashIndex:
+    """
+    Index of 64-bit page SimHashes that finds stored hashes within
+    max_distance bits of a query. Each hash is split into max_distance + 1
+    bands; two hashes that differ in at most max_distance bits agree exactly
+    on at least one band, so only hashes sharing a band are compared.
+    """
+
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        width = -(-64 // (max_distance + 1))
+        self._bands = [(shift, (1 << min(width, 64 - shift)) - 1) for shift in range(0, 64, width)]
+        self._buckets = defaultdict(list)
+
+    def _keys(self, simhash):
+        return [(band, simhash >> shift & mask) for band, (shift, mask) in enumerate(self._bands)]
+
+    def add(self, simhash, url):
+        for key in self._keys(simhash):
+            self._buckets[key].append((simhash, url))
+
+    def find_near(self, simhash, url):
+        """Return another page whose SimHash is within max_distance bits, or None."""
+        for key in self._keys(simhash):
+            for other_simhash, other_url in self._buckets[key]:
+                if other_url != url and bin(simhash ^ other_simhash).count('1') <= self.max_distance:
+                    return other_url
+        return None
+
 # Global variables
-visited_lock = Lock()
-visited = set()
+# The crawl runs on a single event loop, so these need no locking
+visited = UrlFingerprintSet()
 processed_urls = set()
-queue = Queue()
+# URLs claimed by this run but not processed yet; only held in memory, so a
+# URL that is dropped before processing can be crawled again later
+claimed_urls = set()
+# Frontier sharded per host; ready_heap holds (next ready time, host) for every host with queued URLs
+frontier = defaultdict(deque)
+ready_heap = []
+host_next_fetch = {}
+processed_log = None
+visited_log = None
+crawl_meta = None
+page_simhashes = None
 
 # Settings
 MAX_CRAWL_LIMIT = 2  # Limit the number of URLs to crawl
+MAX_CONCURRENCY = 32  # URL groups being processed at the same time
+LLM_PAGE_GROUP_SIZE = 8  # Pages whose chunks share LLM prompts
+PARSE_WORKERS = 4  # Threads parsing fetched HTML
 VISITED_FILE = 'record/visited_urls.json'
 PROCESSED_FILE = 'record/processed_urls.json'
+# Used instead of VISITED_FILE when pybloomfiltermmap3 is installed
+VISITED_BLOOM_FILE = 'record/visited_urls.bloom'
+VISITED_BLOOM_CAPACITY = 10_000_000
+VISITED_BLOOM_ERROR_RATE = 0.001
+# Otherwise visited URLs are saved as packed 64-bit fingerprints
+VISITED_FINGERPRINT_FILE = 'record/visited_urls.bin'
+# URLs processed since the last PROCESSED_FILE snapshot, one per line
+PROCESSED_LOG_FILE = 'record/processed_urls.log'
+# Fingerprints of URLs visited since the last VISITED_FINGERPRINT_FILE snapshot
+VISITED_LOG_FILE = 'record/visited_urls.log'
+# Take a full snapshot after this many processed URLs
+SNAPSHOT_INTERVAL = 100
+# SimHashes of extracted pages for near-duplicate detection, and the
+# ETag/Last-Modified validators, body hash and links of processed pages for
+# revalidating them on a recrawl; kept across crawls
+CRAWL_META_DB = 'record/crawl_meta.db'
+# Revisit processed pages with conditional GETs and re-extract the ones that changed
+RECRAWL = False
+# Pages whose text SimHashes differ in at most this many bits are near-duplicates
+# (shared templates, mirrored wiki pages) and are extracted only once
+SIMHASH_MAX_DISTANCE = 2
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = {'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'gclid', 'fbclid'}
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# A URL is crawled only if it contains one of these substrings
+URL_KEYWORDS = ('dfrobot',)
+
+def build_keyword_matcher(keywords):
+    """
+    Return a function telling whether a URL contains any of the keywords.
+    With pyahocorasick all keywords are matched in one pass over the URL.
+    """
+    if not AHOCORASICK_AVAILABLE:
+        return lambda url: any(keyword in url for keyword in keywords)
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return lambda url: next(automaton.iter(url), None) is not None
+
+url_has_keyword = build_keyword_matcher(URL_KEYWORDS)
+
+# The crawl is a three-stage pipeline: pages are fetched on the event loop,
+# parsed on parse_executor, and extracted and written to Neo4j on
+# extract_executor, so a slow stage never blocks the other two
+parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix='parse')
+extract_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix='extract')
+
+def read_url_list(path):
+    """Read a JSON list of URLs, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def write_url_list(path, urls):
+    """Write URLs as a JSON list, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(list(urls)))
+    else:
+        with open(path, 'w') as f:
+            json.dump(list(urls), f)
 
 # Load visited and processed URLs from file
 def load_visited_and_processed():
     global visited, processed_urls
-    if os.path.exists(VISITED_FILE):
-        with open(VISITED_FILE, 'r') as f:
-            visited = set(json.load(f))
-    if os.path.exists(PROCESSED_FILE):
-        with open(PROCESSED_FILE, 'r') as f:
-            processed_urls = set(json.load(f))
+    if BLOOMFILTER_AVAILABLE:
+        # The memory-mapped filter file is its own snapshot; it is seeded from
+        # VISITED_FILE the first time so an existing crawl carries over
+        if os.path.exists(VISITED_BLOOM_FILE):
+            visited = BloomFilter.open(VISITED_BLOOM_FILE)
+        else:
+            visited = BloomFilter(VISITED_BLOOM_CAPACITY, VISITED_BLOOM_ERROR_RATE, VISITED_BLOOM_FILE)
+            try:
+                visited.update(read_url_list(VISITED_FILE))
+            except FileNotFoundError:
+                pass
+    else:
+        # Missing files are handled by catching the error from open(), which
+        # saves a stat per file over checking os.path.exists first
+        fingerprints = read_file_if_exists(VISITED_FINGERPRINT_FILE)
+        if fingerprints is not None:
+            visited = UrlFingerprintSet.from_bytes(fingerprints)
+        else:
+            try:
+                visited.update(read_url_list(VISITED_FILE))
+            except FileNotFoundError:
+                pass
+        visited_journal = read_file_if_exists(VISITED_LOG_FILE)
+        if visited_journal:
+            visited.update_from_bytes(visited_journal)
+    try:
+        processed_urls = set(read_url_list(PROCESSED_FILE))
+    except FileNotFoundError:
+        pass
+    processed_journal = read_file_if_exists(PROCESSED_LOG_FILE)
+    if processed_journal:
+        processed_urls.update(processed_journal.decode('utf-8').splitlines())
+
+def read_file_if_exists(path):
+    """Return the contents of a file as bytes, or None if it does not exist."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+# Record a processed URL without rewriting the whole snapshot
+def log_processed(url):
+    global processed_log
+    if processed_log is None:
+        processed_log = open(PROCESSED_LOG_FILE, 'a', encoding='utf-8')
+    processed_log.write(url + '\n')
+    processed_log.flush()
+
+# Record a visited URL's fingerprint; the Bloom filter file is updated in place instead
+def log_visited(url):
+    global visited_log
+    if BLOOMFILTER_AVAILABLE:
+        return
+    if visited_log is None:
+        visited_log = open(VISITED_LOG_FILE, 'ab')
+    visited_log.write(UrlFingerprintSet.fingerprint(url).to_bytes(8, 'little'))
 
 # Save visited and processed URLs to file
 def save_visited_and_processed():
-    with open(VISITED_FILE, 'w') as f:
-        json.dump(list(visited), f)
-    with open(PROCESSED_FILE, 'w') as f:
-        json.dump(list(processed_urls), f)
+    global processed_log, visited_log
+    if BLOOMFILTER_AVAILABLE:
+        visited.sync()
+    else:
+        with open(VISITED_FINGERPRINT_FILE, 'wb') as f:
+            f.write(visited.to_bytes())
+        if visited_log is not None:
+            visited_log.close()
+            visited_log = None
+        remove_file_if_exists(VISITED_LOG_FILE)
+    write_url_list(PROCESSED_FILE, processed_urls)
+    # The snapshot now holds everything the log recorded
+    if processed_log is not None:
+        processed_log.close()
+        processed_log = None
+    remove_file_if_exists(PROCESSED_LOG_FILE)
 
-def extract_links(url):
-    """Extract all links from the page."""
+def remove_file_if_exists(path):
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        html = response.text
-        soup = BeautifulSoup(html, 'html.parser')
-        return [urljoin(url, a.get('href')) for a in soup.find_all('a') if a.get('href')]
-    except requests.exceptions.RequestException as e:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+# Footer and navigation links recur on every page, so most calls are cache hits
+@functools.lru_cache(maxsize=131072)
+def canonicalize_url(url):
+    """
+    Normalize a URL so that variants of the same page dedupe to one entry:
+    lowercase scheme and host, no default port, no trailing slash, sorted
+    query without tracking parameters, and no fragment. The result is
+    interned, so the copies held by the frontier and processed_urls share
+    one string.
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    try:
+        port = parts.port
+    except ValueError:  # malformed port, leave the netloc as it is
+        port = None
+    if port is not None and DEFAULT_PORTS.get(scheme) == port:
+        netloc = netloc.rsplit(':', 1)[0]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in TRACKING_PARAMS))
+    return sys.intern(urlunsplit((scheme, netloc, parts.path.rstrip('/') or '/', query, '')))
+
+def get_crawl_meta():
+    """Open the page metadata database on first use."""
+    global crawl_meta
+    if crawl_meta is None:
+        crawl_meta = sqlite3.connect(CRAWL_META_DB)
+        crawl_meta.execute(
+            "CREATE TABLE IF NOT EXISTS page_meta "
+            "(url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash BLOB, links TEXT)")
+        crawl_meta.execute("CREATE TABLE IF NOT EXISTS page_simhash (url TEXT PRIMARY KEY, simhash BLOB)")
+    return crawl_meta
+
+def get_page_simhashes():
+    """Load the SimHashes of previously extracted pages on first use."""
+    global page_simhashes
+    if page_simhashes is None:
+        page_simhashes = SimHashIndex(SIMHASH_MAX_DISTANCE)
+        for url, simhash in get_crawl_meta().execute("SELECT url, simhash FROM page_simhash"):
+            page_simhashes.add(int.from_bytes(simhash, 'little'), url)
+    return page_simhashes
+
+def find_near_duplicates(urls, simhashes):
+    """
+    Return a dict mapping each page whose text is a near-duplicate of an
+    already extracted page, or of an earlier page in urls, to that page.
+    Pages without a SimHash are never near-duplicates.
+    """
+    extracted = get_page_simhashes()
+    group = SimHashIndex(SIMHASH_MAX_DISTANCE)
+    duplicates = {}
+    for url, simhash in zip(urls, simhashes):
+        if simhash is None:
+            continue
+        duplicate_of = extracted.find_near(simhash, url) or group.find_near(simhash, url)
+        if duplicate_of:
+            duplicates[url] = duplicate_of
+        else:
+            group.add(simhash, url)
+    return duplicates
+
+def record_page_content(url, simhash):
+    """Record the SimHash of a page whose graph has been extracted."""
+    get_page_simhashes().add(simhash, url)
+    meta = get_crawl_meta()
+    meta.execute("INSERT OR REPLACE INTO page_simhash VALUES (?, ?)", (url, simhash.to_bytes(8, 'little')))
+    meta.commit()
+
+def save_page_meta(url, validators, links):
+    """Record the validators, body hash and links of a processed page for the next recrawl."""
+    meta = get_crawl_meta()
+    meta.execute("INSERT OR REPLACE INTO page_meta VALUES (?, ?, ?, ?, ?)", (url, *validators, json.dumps(links)))
+    meta.commit()
+
+async def extract_links(session, url):
+    """
+    Extract all links from the page. Returns (links, simhash, changed,
+    validators). simhash is None if the page could not be fetched or has too
+    little text. A page processed before is fetched with a conditional GET on
+    the validators saved by save_page_meta; if it has not changed, changed is
+    False and its links come from the saved metadata. validators is
+    (etag, last_modified, body_hash) for a page whose body was fetched, else None.
+    """
+    row = None
+    headers = {}
+    if url in processed_urls:
+        row = get_crawl_meta().execute(
+            "SELECT etag, last_modified, body_hash, links FROM page_meta WHERE url = ?", (url,)).fetchone()
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+    try:
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            if response.status == 304 and row:
+                return json.loads(row[3]), None, False, None
+            response.raise_for_status()
+            html = await response.read()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logging.error(f"Error fetching {url}: {e}")
-        return []
+        return [], None, True, None
+    links, simhash = await asyncio.get_running_loop().run_in_executor(parse_executor, extract_page_links, url, html)
+    # Servers without validators still resend identical bodies
+    body_hash = hashlib.blake2b(html, digest_size=8).digest()
+    return links, simhash, not (row and row[2] == body_hash), (etag, last_modified, body_hash)
 
-def process_url(graph, model, allowed_nodes, allowed_relationship, url):
-    """Crawl and process a single URL."""
-    global visited, processed_urls
+def extract_page_links(url, html):
+    """Return the canonical absolute URLs linked from a fetched page and the SimHash of its text."""
+    hrefs, text = parse_page(html)
+    return [canonicalize_url(urljoin(url, href)) for href in hrefs], simhash_text(text)
 
-    
-    if url in visited or url in processed_urls:
-        return
-    visited.add(url)
+def parse_page(html):
+    """Return the non-empty href values of all anchors in the page and its visible text."""
+    # selectolax parses in C and skips building a Python object per tag
+    if SELECTOLAX_AVAILABLE:
+        tree = HTMLParser(html)
+        hrefs = [href for node in tree.css('a[href]') if (href := node.attributes.get('href'))]
+        tree.strip_tags(['script', 'style'])
+        return hrefs, tree.body.text(separator=' ') if tree.body else ''
+    soup = BeautifulSoup(html, 'html.parser')
+    hrefs = [a.get('href') for a in soup.find_all('a') if a.get('href')]
+    for tag in soup(['script', 'style']):
+        tag.decompose()
+    return hrefs, soup.get_text(' ')
+
+def simhash_text(text):
+    """
+    64-bit SimHash over the distinct word trigrams of a text, or None if the
+    text is too short for a trigram; such pages are never near-duplicates.
+    """
+    words = text.split()
+    if len(words) < 3:
+        return None
+    shingles = {' '.join(words[i:i + 3]) for i in range(len(words) - 2)}
+    # Bit k of the SimHash is set when more than half of the shingle hashes
+    # have bit k set; the bits are counted column-wise over all hashes at once
+    digests = b''.join(hashlib.blake2b(shingle.encode(), digest_size=8).digest() for shingle in shingles)
+    if NUMPY_AVAILABLE:
+        bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        majority = bits.sum(axis=0) * 2 > len(shingles)
+        return int.from_bytes(np.packbits(majority, bitorder='little').tobytes(), 'little')
+    ones = [0] * 64
+    for position in range(8):
+        for byte, count in Counter(digests[position::8]).items():
+            for bit in range(8):
+                if byte >> bit & 1:
+                    ones[position * 8 + bit] += count
+    return sum(1 << bit for bit, count in enumerate(ones) if count * 2 > len(shingles))
 
-    if 'dfrobot' not in url:
+def claim_url(url):
+    """
+    Claim a URL for this run and return its canonical form, or None if it
+    should not be crawled. The claim is only recorded as visited once the
+    URL's graph has been extracted; see mark_visited.
+    """
+    url = canonicalize_url(url)
+    if url in claimed_urls or url in visited or url in processed_urls:
+        return None
+
+    if not url_has_keyword(url):
         logging.info(f"Skipping URL without keyword: {url}")
-        return
+        mark_visited(url)
+        return None
+    claimed_urls.add(url)
+    return url
 
-    logging.info(f"Processing: {url}")
+def mark_visited(url):
+    """Record a URL as visited, in memory and in the visited log."""
+    claimed_urls.discard(url)
+    visited.add(url)
+    log_visited(url)
+
+def release_urls(urls):
+    """Drop the claims on URLs that will not be processed in this run."""
+    claimed_urls.difference_update(urls)
+
+def enqueue_url(url):
+    """Add a claimed URL to its host's queue in the frontier."""
+    host = urlsplit(url).netloc
+    if not frontier[host]:
+        heapq.heappush(ready_heap, (host_next_fetch.get(host, 0.0), host))
+    frontier[host].append(url)
+
+def next_round(delay):
+    """
+    Drain the frontier host by host in order of when each host is next ready,
+    so URLs from different sites interleave instead of queueing behind one site.
+    """
+    urls = []
+    while ready_heap:
+        ready_time, host = heapq.heappop(ready_heap)
+        urls.append(frontier[host].popleft())
+        if frontier[host]:
+            heapq.heappush(ready_heap, (ready_time + delay, host))
+        else:
+            del frontier[host]
+    return urls
+
+async def wait_for_host(url, delay):
+    """Wait until the URL's host may be fetched again; other hosts are not held up."""
+    host = urlsplit(url).netloc
+    now = time.monotonic()
+    ready = max(now, host_next_fetch.get(host, now))
+    host_next_fetch[host] = ready + delay
+    if ready > now:
+        await asyncio.sleep(ready - now)
+
+async def process_url_group(session, semaphore, graph, model, allowed_nodes, allowed_relationship, urls, delay=1):
+    """
+    Crawl and process a group of URLs whose source nodes already exist. The
+    group's pages are extracted together so short pages share LLM prompts.
+    """
+    # Be nice to the servers, without holding a processing slot while waiting
+    await asyncio.gather(*[wait_for_host(url, delay) for url in urls])
+    async with semaphore:
+        logging.info(f"Processing: {urls}")
+
+        # Fetch the pages first so that unchanged and near-duplicate ones skip
+        # the LLM and Neo4j; pages without a SimHash are never treated as duplicates
+        fetched = await asyncio.gather(*[extract_links(session, url) for url in urls])
+        changed_urls = [url for url, (_, _, changed, _) in zip(urls, fetched) if changed]
+        if len(changed_urls) < len(urls):
+            logging.info(f"Skipping unchanged pages: {[url for url in urls if url not in changed_urls]}")
+        simhash_of = {url: simhash for url, (_, simhash, _, _) in zip(urls, fetched)}
+        duplicates = find_near_duplicates(changed_urls, [simhash_of[url] for url in changed_urls])
+        for url, duplicate_of in duplicates.items():
+            logging.info(f"Skipping {url}: near-duplicate of {duplicate_of}")
+        distinct_urls = [url for url in changed_urls if url not in duplicates]
 
-    # First, process the source node graph for this URL
-    lst_file, success_count, fail_count = create_source_node_graph_dfrobot_url(graph, model, url, "dfrobot")
-    logging.info(f"Processed source node for {url}: Success: {success_count}, Failures: {fail_count}")
+        if distinct_urls:
+            # Graph extraction and the Neo4j driver are blocking, so they run in
+            # their own thread pool instead of stalling the event loop
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(
+                    extract_executor, extract_graph_from_web_pages, graph, model, distinct_urls, allowed_nodes, allowed_relationship)
+            except Exception:
+                # Nothing was recorded for the group, so a later run retries it
+                release_urls(urls)
+                raise
+            logging.info(f"Extracted graph data from {distinct_urls}: {results}")
 
-    # Then, extract the graph from the page
-    result_dic = extract_graph_from_web_page(graph, model, url, allowed_nodes, allowed_relationship)
-    logging.info(f"Extracted graph data from {url}: {result_dic}")
+            # Only content that reached the graph can make later pages duplicates
+            for url in distinct_urls:
+                if simhash_of[url] is not None:
+                    record_page_content(url, simhash_of[url])
 
-    # Add to processed URLs
-    #with visited_lock:
-    processed_urls.add(url)
+        for url, (page_links, _, _, validators) in zip(urls, fetched):
+            # Saved only once the page is in the graph, so a recrawl never
+            # skips a page whose extraction failed as unchanged
+            if validators is not None:
+                save_page_meta(url, validators, page_links)
 
-    # Save after processing each URL to avoid losing progress
-    save_visited_and_processed()
+            # Pages revisited by a recrawl are already recorded
+            if url in processed_urls:
+                continue
 
-    # Extract and queue the new links for crawling
-    links = extract_links(url)
+            # Add to visited and processed URLs only now that the page is in the graph
+            mark_visited(url)
+            processed_urls.add(url)
+
+            # Log each URL as it is processed to avoid losing progress
+            log_processed(url)
+            if len(processed_urls) % SNAPSHOT_INTERVAL == 0:
+                save_visited_and_processed()
+
+        links = [link for page_links, _, _, _ in fetched for link in page_links]
+
+    # Queue the new links for crawling; links are claimed here so that ones
+    # already seen, like site-wide footer links, never reach the frontier
     for link in links:
         if len(processed_urls) < MAX_CRAWL_LIMIT:
-            queue.put(link)  # Add the new link to the queue
+            url = claim_url(link)
+            if url:
+                enqueue_url(url)  # Add the new link to the frontier
         else:
             logging.info(f"URL limit reached: {MAX_CRAWL_LIMIT}, here are the processed  {processed_urls}")
 
-def crawl_urls_in_parallel(graph, model, allowed_nodes, allowed_relationship, delay=1, max_workers=5):
-    """Crawl URLs in parallel and process them."""
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = []
-        while not queue.empty() and len(processed_urls) < MAX_CRAWL_LIMIT:
-            url = queue.get()
-            future = executor.submit(process_url, graph, model, allowed_nodes, allowed_relationship, url)
-            futures.append(future)
-            time.sleep(delay)  # Be nice to the server
-        
-        # Wait for all submitted tasks to finish
-        wait(futures)
-        
-        if len(processed_urls) >= MAX_CRAWL_LIMIT:
-            logging.info(f"URL limit reached: {MAX_CRAWL_LIMIT}, here are the processed {processed_urls}")
-        else:
-            logging.info("Queue is empty")
+async def crawl_urls_in_parallel(graph, model, allowed_nodes, allowed_relationship, delay=1, max_workers=MAX_CONCURRENCY):
+    """Crawl URLs concurrently on one event loop and process them."""
+    semaphore = asyncio.Semaphore(max_workers)
+    # One keep-alive connection pool for the whole crawl; limit_per_host keeps
+    # at most 8 requests in flight against any single site
+    connector = aiohttp.TCPConnector(limit=64, limit_per_host=8)
+    loop = asyncio.get_running_loop()
+    async with aiohttp.ClientSession(connector=connector, headers={'User-Agent': 'GraphBuilder/2.0'}) as session:
+        # Each round processes the whole frontier; the links it finds form the next round
+        while ready_heap:
+            batch = next_round(delay)
+            # Processed pages are only in the frontier on a recrawl; they
+            # already have source nodes and don't count towards the limit
+            revisits = [url for url in batch if url in processed_urls]
+            batch = [url for url in batch if url not in processed_urls]
+            # URLs past the crawl limit are released, so a later run still crawls them
+            budget = max(MAX_CRAWL_LIMIT - len(processed_urls), 0)
+            release_urls(batch[budget:])
+            batch = batch[:budget]
+
+            if batch:
+                # The round's source nodes are written in one transaction instead of one per URL
+                lst_file, success_count, fail_count = await loop.run_in_executor(
+                    None, create_source_nodes_graph_dfrobot_urls, graph, model, batch, "dfrobot")
+                logging.info(f"Processed source nodes for {len(batch)} URLs: Success: {success_count}, Failures: {fail_count}")
+                # Only pages that got a source node go on to extraction; lst_file holds their unquoted URLs
+                created_urls = {file['url'] for file in lst_file}
+                release_urls([url for url in batch if unquote(url) not in created_urls])
+                batch = [url for url in batch if unquote(url) in created_urls]
+            batch = revisits + batch
+            if not batch:
+                continue
+
+            groups = [batch[i:i + LLM_PAGE_GROUP_SIZE] for i in range(0, len(batch), LLM_PAGE_GROUP_SIZE)]
+            results = await asyncio.gather(*[
+                process_url_group(session, semaphore, graph, model, allowed_nodes, allowed_relationship, urls, delay)
+                for urls in groups
+            ], return_exceptions=True)
+            for urls, result in zip(groups, results):
+                if isinstance(result, Exception):
+                    logging.error(f"Error processing {urls}: {result}")
+
+    if len(processed_urls) >= MAX_CRAWL_LIMIT:
+        logging.info(f"URL limit reached: {MAX_CRAWL_LIMIT}, here are the processed {processed_urls}")
+    else:
+        logging.info("Frontier is empty")
+
+def main(start_urls, graph, model, allowed_nodes, allowed_relationship, recrawl=RECRAWL):
+    # On a recrawl every processed page is revalidated, and re-extracted if it changed
+    if recrawl:
+        for url in processed_urls:
+            claimed_urls.add(url)
+            enqueue_url(url)
 
-def main(start_urls, graph, model, allowed_nodes, allowed_relationship):
     # Enqueue all the starting URLs
-    for url in start_urls:
-        queue.put(url)
+    for url in filter(None, map(claim_url, start_urls)):
+        enqueue_url(url)
 
-    # Start crawling and processing URLs in parallel
-    crawl_urls_in_parallel(graph, model, allowed_nodes, allowed_relationship)
+    # Start crawling and processing URLs concurrently
+    asyncio.run(crawl_urls_in_parallel(graph, model, allowed_nodes, allowed_relationship))
 
 if __name__ == "__main__":
     # To Be Modified
@@ -156,8 +673,8 @@ if __name__ == "__main__":
 
     # Load visited and processed URLs from files
     load_visited_and_processed()
+    # Save visited and processed URLs on exit, including when the crawl is interrupted
+    atexit.register(save_visited_and_processed)
 
     main(start_urls, graph, model, allowedNodes, allowedRelationships)
-    logging.info(f"Done Crawling. Starting to save. visited: {visited}; processed: {processed_urls}")
-    # Save visited and processed URLs when finished
-    save_visited_and_processed()
+    logging.info(f"Done Crawling. Starting to save. visited: {len(visited)} URLs; processed: {processed_urls}")
@@ -9,10 +9,8 @@ Original File: main_url_sync.py
 New Location: src/graphbuilder/application/cli/legacy_url_sync_main.py
 """
 
-import os
 import json
 import logging
-from threading import Lock
 from graphbuilder.infrastructure.database.neo4j_client import graphDBdataAccess
 from graphbuilder.core.processing.processor import create_source_node_graph_dfrobot_url, extract_graph_from_web_page
 from graphbuilder.core.utils.common_functions import create_graph_database_connection
@@ -21,7 +19,7 @@ from graphbuilder.core.utils.common_functions import create_graph_database_conne
 logging.basicConfig(level=logging.INFO)
 
 # Global variables
-visited_lock = Lock()
+# URLs are processed one at a time, so these need no locking
 visited = set()
 processed_urls = set()
 
@@ -33,12 +31,16 @@ PROCESSED_FILE = 'record/processed_urls.json'
 # Load visited and processed URLs from file
 def load_visited_and_processed():
     global visited, processed_urls
-    if os.path.exists(VISITED_FILE):
+    try:
         with open(VISITED_FILE, 'r') as f:
             visited = set(json.load(f))
-    if os.path.exists(PROCESSED_FILE):
+    except FileNotFoundError:
+        pass
+    try:
         with open(PROCESSED_FILE, 'r') as f:
             processed_urls = set(json.load(f))
+    except FileNotFoundError:
+        pass
 
 # Save visited and processed URLs to file
 def save_visited_and_processed():
@@ -72,7 +74,6 @@ def process_url(graph, model, allowed_nodes, allowed_relationship, url):
     logging.info(f"Extracted graph data from {url}: {result_dic}")
 
     # Add to processed URLs
-    #with visited_lock:
     processed_urls.add(url)
 
     # Save after processing each URL to avoid losing progress
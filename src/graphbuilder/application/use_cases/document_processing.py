@@ -12,7 +12,7 @@ from datetime import datetime, timezone
 from abc import ABC, abstractmethod
 
 from ...domain.models.graph_models import (
-    SourceDocument, DocumentChunk, GraphEntity, GraphRelationship,
+    SourceDocument, DocumentChunk, DocumentChunkBatch, GraphEntity, GraphRelationship,
     EntityType, RelationshipType, ProcessingStatus
 )
 from ...domain.models.processing_models import (
@@ -217,40 +217,46 @@ class ProcessDocumentUseCase(UseCase):
     async def _execute_pipeline(self, pipeline: ProcessingPipeline) -> ProcessingResult:
         """Execute processing pipeline with sophisticated orchestration."""
         
+        # Scheduled asyncio tasks and the pipeline tasks they execute
+        running: Dict[asyncio.Task, ProcessingTask] = {}
+        
         try:
             pipeline.start_pipeline()
             self.logger.info(f"Starting pipeline: {pipeline.name}")
             
             while not self._is_pipeline_complete(pipeline):
-                # Get ready tasks
-                ready_tasks = pipeline.get_ready_tasks()
-                running_tasks = pipeline.get_running_tasks()
+                # Start ready tasks that are not already scheduled, up to the parallelism limit
+                available_slots = pipeline.max_parallel_tasks - len(running)
+                scheduled_ids = {task.id for task in running.values()}
+                ready_tasks = [task for task in pipeline.get_ready_tasks() if task.id not in scheduled_ids]
+                
+                for task in ready_tasks[:max(available_slots, 0)]:
+                    running[asyncio.create_task(self._execute_task(task, pipeline))] = task
                 
-                # Check if we can start new tasks
-                available_slots = pipeline.max_parallel_tasks - len(running_tasks)
+                if not running:
+                    # The remaining tasks depend on failed ones and can never start
+                    break
                 
-                if available_slots > 0 and ready_tasks:
-                    # Start new tasks
-                    tasks_to_start = ready_tasks[:available_slots]
+                # Wake up as soon as any task finishes so its dependents start immediately
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                
+                for finished in done:
+                    task = running.pop(finished)
+                    task_result = finished.result()
                     
-                    for task in tasks_to_start:
-                        task_result = await self._execute_task(task, pipeline)
+                    if task_result.success:
+                        pipeline.complete_task(task.id, task_result)
+                    else:
+                        pipeline.fail_task(task.id, task_result)
                         
-                        if task_result.success:
-                            pipeline.complete_task(task.id, task_result)
-                        else:
-                            pipeline.fail_task(task.id, task_result)
-                            
-                            if not pipeline.continue_on_error:
-                                pipeline.fail_pipeline(f"Task {task.name} failed: {task_result.message}")
-                                return ProcessingResult(
-                                    success=False,
-                                    message=f"Pipeline failed due to task failure: {task_result.message}",
-                                    errors=task_result.errors
-                                )
-                
-                # Small delay to prevent busy waiting
-                await asyncio.sleep(0.1)
+                        if not pipeline.continue_on_error:
+                            await self._cancel_running_tasks(running)
+                            pipeline.fail_pipeline(f"Task {task.name} failed: {task_result.message}")
+                            return ProcessingResult(
+                                success=False,
+                                message=f"Pipeline failed due to task failure: {task_result.message}",
+                                errors=task_result.errors
+                            )
             
             # Check final status
             if len(pipeline.failed_tasks) > 0 and not pipeline.continue_on_error:
@@ -270,6 +276,7 @@ class ProcessDocumentUseCase(UseCase):
                 
         except Exception as e:
             self.logger.error(f"Pipeline execution error: {str(e)}", exc_info=True)
+            await self._cancel_running_tasks(running)
             pipeline.fail_pipeline(str(e))
             return ProcessingResult(
                 success=False,
@@ -277,6 +284,13 @@ class ProcessDocumentUseCase(UseCase):
                 errors=[str(e)]
             )
     
+    async def _cancel_running_tasks(self, running: Dict[asyncio.Task, ProcessingTask]) -> None:
+        """Cancel scheduled tasks and wait for them to unwind."""
+        for scheduled in running:
+            scheduled.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        running.clear()
+    
     def _is_pipeline_complete(self, pipeline: ProcessingPipeline) -> bool:
         """Check if pipeline execution is complete."""
         total_tasks = len(pipeline.tasks)
@@ -348,8 +362,7 @@ class ProcessDocumentUseCase(UseCase):
         chunks = self._create_content_chunks(content, document.id, task.configuration)
         
         # Save chunks
-        for chunk in chunks:
-            await self.document_repo.save_chunk(chunk)
+        await self.document_repo.save_chunks_bulk(chunks)
         
         # Update document
         document.total_chunks = len(chunks)
@@ -372,37 +385,26 @@ class ProcessDocumentUseCase(UseCase):
         content: str,
         document_id: str,
         config: Dict[str, Any]
-    ) -> List[DocumentChunk]:
-        """Create content chunks from document content."""
+    ) -> DocumentChunkBatch:
+        """Create a columnar batch of content chunks from document content."""
         
         chunk_size = config.get("chunk_size", 1000)
         overlap_size = config.get("overlap_size", 100)
+        content_length = len(content)
         
-        chunks = []
-        start = 0
-        chunk_index = 0
+        # Precompute every window up front; the last one is the first to reach the end
+        step = max(1, chunk_size - overlap_size)
+        starts = range(0, max(content_length - chunk_size, 0) + step, step)
+        offsets = [(start, min(start + chunk_size, content_length)) for start in starts]
         
-        while start < len(content):
-            end = min(start + chunk_size, len(content))
+        # Skip blank windows without allocating a stripped copy
+        batch = DocumentChunkBatch(document_id=document_id)
+        for start, end in offsets:
             chunk_content = content[start:end]
-            
-            if chunk_content.strip():
-                chunk = DocumentChunk(
-                    content=chunk_content,
-                    document_id=document_id,
-                    chunk_index=chunk_index,
-                    token_count=len(chunk_content.split()),  # Simple token count
-                    character_count=len(chunk_content),
-                    start_position=start,
-                    end_position=end
-                )
-                chunks.append(chunk)
-                chunk_index += 1
-            
-            # Move start position with overlap
-            start = end - overlap_size if end < len(content) else end
+            if chunk_content and not chunk_content.isspace():
+                batch.append(chunk_content, start, end, len(chunk_content.split()))  # Simple token count
         
-        return chunks
+        return batch
     
     async def _execute_entity_extraction(self, task: ProcessingTask) -> ProcessingResult:
         """Execute entity extraction task."""
@@ -420,36 +422,79 @@ class ProcessDocumentUseCase(UseCase):
         
         total_entities = 0
         processed_chunks = 0
+        batch_size = self.llm_service.max_entity_batch_size(task.configuration)
         
-        for i, chunk in enumerate(chunks):
-            try:
-                # Extract entities using LLM
-                extraction_result = await self.llm_service.extract_entities(
-                    chunk.content,
-                    task.configuration
+        # Only chunks without a cached LLM response are sent for extraction
+        cached_entities, uncached = self.llm_service.partition_by_cache(
+            [chunk.content for chunk in chunks],
+            task.configuration
+        )
+        
+        # Bound the number of LLM requests in flight at once
+        semaphore = asyncio.Semaphore(max(1, task.configuration.get("llm_concurrency", 8)))
+        extracted_chunks = len(cached_entities)
+        
+        async def process_group(indices: List[int]):
+            nonlocal extracted_chunks
+            async with semaphore:
+                entities_by_chunk = await self._extract_entities_for_chunks(
+                    [chunks[i] for i in indices],
+                    task.configuration,
+                    indices
                 )
+            
+            extracted_chunks += len(entities_by_chunk)
+            progress = (extracted_chunks / len(chunks)) * 100
+            task.update_progress(progress, f"Extracted entities from {extracted_chunks}/{len(chunks)} chunks")
+            return indices, entities_by_chunk
+        
+        results = await asyncio.gather(
+            *(process_group(uncached[start:start + batch_size]) for start in range(0, len(uncached), batch_size)),
+            return_exceptions=True
+        )
+        if cached_entities:
+            results.append((list(cached_entities), list(cached_entities.values())))
+        
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"Error extracting entities from chunk group: {str(result)}")
+                continue
+            
+            indices, entities_by_chunk = result
+            group_entities: List[GraphEntity] = []
+            group_chunks = 0
+            
+            for i, entities in zip(indices, entities_by_chunk):
+                if entities is None:
+                    continue
                 
-                if extraction_result.success:
-                    entities = extraction_result.data.get("entities", [])
-                    
-                    # Save entities
-                    for entity_data in entities:
-                        entity = GraphEntity(
+                try:
+                    group_entities.extend(
+                        GraphEntity(
                             name=entity_data.get("name"),
                             entity_type=EntityType(entity_data.get("type", "CONCEPT")),
                             description=entity_data.get("description"),
                             properties=entity_data.get("properties", {})
                         )
-                        await self.graph_repo.save_entity(entity)
-                        total_entities += 1
-                
-                processed_chunks += 1
-                progress = (processed_chunks / len(chunks)) * 100
-                task.update_progress(progress, f"Processed {processed_chunks}/{len(chunks)} chunks")
-                
+                        for entity_data in entities
+                    )
+                    group_chunks += 1
+                    
+                except Exception as e:
+                    self.logger.error(f"Error extracting entities from chunk {i}: {str(e)}")
+                    continue
+            
+            # Save the group's entities in one round-trip
+            try:
+                await self.graph_repo.save_entities_bulk(group_entities)
             except Exception as e:
-                self.logger.error(f"Error extracting entities from chunk {i}: {str(e)}")
+                self.logger.error(
+                    f"Error saving entities from chunks {', '.join(map(str, indices))}: {str(e)}"
+                )
                 continue
+            
+            total_entities += len(group_entities)
+            processed_chunks += group_chunks
         
         return ProcessingResult(
             success=True,
@@ -460,6 +505,49 @@ class ProcessDocumentUseCase(UseCase):
             }
         )
     
+    async def _extract_entities_for_chunks(
+        self,
+        chunks: List[DocumentChunk],
+        configuration: Dict[str, Any],
+        indices: List[int]
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Extract entities for a group of chunks, one entity list per chunk.
+        
+        Groups are sent in one batched LLM call; if that fails, each chunk is
+        retried on its own. A chunk whose extraction raises yields None.
+        """
+        
+        if len(chunks) > 1:
+            batch_result = await self.llm_service.extract_entities_batch(
+                [chunk.content for chunk in chunks],
+                configuration
+            )
+            if batch_result.success:
+                return batch_result.data["entities_by_index"]
+            
+            self.logger.warning(
+                f"Batched entity extraction failed for chunks {', '.join(map(str, indices))}, "
+                f"falling back to per-chunk extraction: {batch_result.message}"
+            )
+        
+        entities_by_chunk: List[Optional[List[Dict[str, Any]]]] = []
+        for i, chunk in zip(indices, chunks):
+            try:
+                # Extract entities using LLM
+                extraction_result = await self.llm_service.extract_entities(
+                    chunk.content,
+                    configuration
+                )
+                entities_by_chunk.append(
+                    extraction_result.data.get("entities", []) if extraction_result.success else []
+                )
+            except Exception as e:
+                self.logger.error(f"Error extracting entities from chunk {i}: {str(e)}")
+                entities_by_chunk.append(None)
+        
+        return entities_by_chunk
+    
     async def _execute_relationship_extraction(self, task: ProcessingTask) -> ProcessingResult:
         """Execute relationship extraction task."""
         
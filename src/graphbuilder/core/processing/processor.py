@@ -9,12 +9,22 @@ Original File: processing.py
 New Location: src/graphbuilder/core/processing/processor.py
 """
 
+import atexit
 import json
 import logging
 import os
+import random
 import sys
+import time
+import weakref
 from datetime import datetime
 import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import accumulate
 from graphbuilder.infrastructure.database.neo4j_client import graphDBdataAccess
 from typing import List
 from graphbuilder.domain.entities.source_node import sourceNode
@@ -22,13 +32,39 @@ from langchain_text_splitters import TokenTextSplitter
 from langchain.docstore.document import Document
 from langchain_community.graphs import Neo4jGraph
 from graphbuilder.infrastructure.services.legacy_llm import generate_graphDocuments
+from graphbuilder.core.utils.file_utils import copy_file_contents
 from graphbuilder.core.utils.common_functions import load_embedding_model, save_graphDocuments_in_neo4j,get_chunk_and_graphDocument,delete_uploaded_local_file, create_gcs_bucket_folder_name_hashed
 import shutil
-from local_file import get_documents_from_file_by_path
+from graphbuilder.infrastructure.crawlers.file_crawler import get_documents_from_file_by_path
 from langchain_community.document_loaders import WebBaseLoader
 import urllib.parse
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 logging.basicConfig(format="%(asctime)s - %(message)s", level="INFO")
+
+# Quotes are removed and newlines become spaces before chunking
+BAD_CHARS_TABLE = str.maketrans({'"': '', "'": '', '\n': ' '})
+
+# Buffer size for merging uploaded parts where sendfile is unavailable
+MERGE_COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Rows per Chunk write transaction
+CHUNK_WRITE_BATCH_SIZE = 1000
+
+_text_splitter = None
+
+def get_text_splitter():
+    """Return the shared TokenTextSplitter, loading its tokenizer on first use."""
+    global _text_splitter
+    if _text_splitter is None:
+        _text_splitter = TokenTextSplitter(chunk_size=200, chunk_overlap=20)
+    return _text_splitter
+
 class CreateChunksofDocument:
     def __init__(self, pages: list[Document], graph: Neo4jGraph):
         self.pages = pages
@@ -46,150 +82,275 @@ class CreateChunksofDocument:
         """
         logging.info("Split file into smaller chunks")
         # number_of_chunks_allowed = int(os.environ.get('NUMBER_OF_CHUNKS_ALLOWED'))
-        text_splitter = TokenTextSplitter(chunk_size=200, chunk_overlap=20)
+        text_splitter = get_text_splitter()
         
         if 'page' in self.pages[0].metadata:
-            chunks = []
-            for i, document in enumerate(self.pages):
-                page_number = i + 1
-                for chunk in text_splitter.split_documents([document]):
-                    chunks.append(Document(page_content=chunk.page_content, metadata={'page_number':page_number}))    
+            # Split all pages in one call, tagging each chunk with its page number
+            texts = [document.page_content for document in self.pages]
+            metadatas = [{'page_number': i + 1} for i in range(len(self.pages))]
+            chunks = text_splitter.create_documents(texts, metadatas=metadatas)
         else:
             chunks = text_splitter.split_documents(self.pages)
         return chunks
     
 def create_relation_between_chunks(graph, file_name, chunks: List[Document])->list:
     logging.info("creating FIRST_CHUNK and NEXT_CHUNK relationships between chunks")
-    current_chunk_id = ""
-    lst_chunks_including_hash = []
-    batch_data = []
-    relationships = []
-    offset=0
-    for i, chunk in enumerate(chunks):
-        page_content_sha1 = hashlib.sha1(chunk.page_content.encode())
-        previous_chunk_id = current_chunk_id
-        current_chunk_id = page_content_sha1.hexdigest()
-        position = i + 1 
-        if i>0:
-            #offset += len(tiktoken.encoding_for_model("gpt2").encode(chunk.page_content))
-            offset += len(chunks[i-1].page_content)
-        if i == 0:
-            firstChunk = True
-        else:
-            firstChunk = False  
-        metadata = {"position": position,"length": len(chunk.page_content), "content_offset":offset}
-        chunk_document = Document(
-            page_content=chunk.page_content, metadata=metadata
-        )
-        
-        chunk_data = {
-            "id": current_chunk_id,
-            "pg_content": chunk_document.page_content,
-            "position": position,
-            "length": chunk_document.metadata["length"],
-            "f_name": file_name,
-            "previous_id" : previous_chunk_id,
-            "content_offset" : offset
+    # Hash all chunks up front; the ids are the Chunk primary keys, so existing
+    # graphs must keep the default sha1 unless they are re-ingested
+    if os.getenv('CHUNK_HASH_ALGO', 'sha1').lower() == 'blake2b':
+        chunk_ids = [hashlib.blake2b(chunk.page_content.encode(), digest_size=20).hexdigest() for chunk in chunks]
+    else:
+        chunk_ids = [hashlib.sha1(chunk.page_content.encode()).hexdigest() for chunk in chunks]
+    # Each chunk's offset is the total length of the chunks before it
+    lengths = [len(chunk.page_content) for chunk in chunks]
+    offsets = [0] + list(accumulate(lengths))[:-1]
+    batch_data = [
+        {
+            "id": chunk_ids[i],
+            "pg_content": chunk.page_content,
+            "position": i + 1,
+            "length": lengths[i],
+            "previous_id": chunk_ids[i-1] if i else "",
+            "content_offset": offsets[i],
+            "is_first": i == 0,
+            **({"page_number": chunk.metadata["page_number"]} if "page_number" in chunk.metadata else {}),
+            **({"start_time": chunk.metadata["start_time"], "end_time": chunk.metadata["end_time"]}
+               if "start_time" in chunk.metadata and "end_time" in chunk.metadata else {}),
         }
-        
-        if 'page_number' in chunk.metadata:
-            chunk_data['page_number'] = chunk.metadata['page_number']
-         
-        if 'start_time' in chunk.metadata and 'end_time' in chunk.metadata:
-            chunk_data['start_time'] = chunk.metadata['start_time']
-            chunk_data['end_time'] = chunk.metadata['end_time'] 
-               
-        batch_data.append(chunk_data)
-        
-        lst_chunks_including_hash.append({'chunk_id': current_chunk_id, 'chunk_doc': chunk})
-        
-        # create relationships between chunks
-        if firstChunk:
-            relationships.append({"type": "FIRST_CHUNK", "chunk_id": current_chunk_id})
-        else:
-            relationships.append({
-                "type": "NEXT_CHUNK",
-                "previous_chunk_id": previous_chunk_id,  # ID of previous chunk
-                "current_chunk_id": current_chunk_id
-            })
-          
-    query_to_create_chunk_and_PART_OF_relation = """
+        for i, chunk in enumerate(chunks)
+    ]
+    lst_chunks_including_hash = [{'chunk_id': chunk_id, 'chunk_doc': chunk} for chunk_id, chunk in zip(chunk_ids, chunks)]
+    
+    # Create chunks with their PART_OF, FIRST_CHUNK and NEXT_CHUNK relationships in one round-trip
+    query_to_create_chunk_and_relations = """
+        MATCH (d:Document {fileName: $f_name})
         UNWIND $batch_data AS data
         MERGE (c:Chunk {id: data.id})
-        SET c.text = data.pg_content, c.position = data.position, c.length = data.length, c.fileName=data.f_name, c.content_offset=data.content_offset
-        WITH data, c
+        SET c.text = data.pg_content, c.position = data.position, c.length = data.length, c.fileName=$f_name, c.content_offset=data.content_offset
+        WITH d, data, c
         SET c.page_number = CASE WHEN data.page_number IS NOT NULL THEN data.page_number END,
             c.start_time = CASE WHEN data.start_time IS NOT NULL THEN data.start_time END,
             c.end_time = CASE WHEN data.end_time IS NOT NULL THEN data.end_time END
-        WITH data, c
-        MATCH (d:Document {fileName: data.f_name})
         MERGE (c)-[:PART_OF]->(d)
-    """
-    graph.query(query_to_create_chunk_and_PART_OF_relation, params={"batch_data": batch_data})
-    
-    query_to_create_FIRST_relation = """ 
-        UNWIND $relationships AS relationship
-        MATCH (d:Document {fileName: $f_name})
-        MATCH (c:Chunk {id: relationship.chunk_id})
-        FOREACH(r IN CASE WHEN relationship.type = 'FIRST_CHUNK' THEN [1] ELSE [] END |
+        FOREACH(r IN CASE WHEN data.is_first THEN [1] ELSE [] END |
                 MERGE (d)-[:FIRST_CHUNK]->(c))
-        """
-    graph.query(query_to_create_FIRST_relation, params={"f_name": file_name, "relationships": relationships})   
-    
-    query_to_create_NEXT_CHUNK_relation = """ 
-        UNWIND $relationships AS relationship
-        MATCH (c:Chunk {id: relationship.current_chunk_id})
-        WITH c, relationship
-        MATCH (pc:Chunk {id: relationship.previous_chunk_id})
-        FOREACH(r IN CASE WHEN relationship.type = 'NEXT_CHUNK' THEN [1] ELSE [] END |
+        FOREACH(r IN CASE WHEN data.previous_id <> '' THEN [1] ELSE [] END |
+                MERGE (pc:Chunk {id: data.previous_id})
                 MERGE (c)<-[:NEXT_CHUNK]-(pc))
-        """
-    graph.query(query_to_create_NEXT_CHUNK_relation, params={"relationships": relationships})   
+    """
+    # Large files are written in several transactions so they don't exhaust Neo4j's transaction memory
+    for i in range(0, len(batch_data), CHUNK_WRITE_BATCH_SIZE):
+        graph.query(query_to_create_chunk_and_relations, params={"f_name": file_name, "batch_data": batch_data[i:i + CHUNK_WRITE_BATCH_SIZE]})
     
     return lst_chunks_including_hash
 
-def update_embedding_create_vector_index(graph, chunkId_chunkDoc_list, file_name):
+class EmbeddingCache:
+    """
+    SQLite-backed store of chunk embeddings keyed by (model, chunk_id).
+
+    Chunk ids are content hashes, so an embedding is fully determined by the
+    pair and can be reused across runs and files.
+    """
+    QUERY_BATCH_SIZE = 500
+
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS embeddings (
+                                       model TEXT NOT NULL, chunk_id TEXT NOT NULL, vector BLOB NOT NULL,
+                                       PRIMARY KEY (model, chunk_id))""")
+
+    def get_many(self, model, chunk_ids):
+        """Return a dict of chunk_id -> embedding for the ids that are cached."""
+        found = {}
+        chunk_ids = list(dict.fromkeys(chunk_ids))
+        with self.lock:
+            for i in range(0, len(chunk_ids), self.QUERY_BATCH_SIZE):
+                batch = chunk_ids[i:i + self.QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.connection.execute(
+                    f"SELECT chunk_id, vector FROM embeddings WHERE model = ? AND chunk_id IN ({placeholders})",
+                    [model, *batch])
+                for chunk_id, vector in rows:
+                    found[chunk_id] = array('d', vector).tolist()
+        return found
+
+    def put_many(self, model, embeddings_by_chunk_id):
+        """Store embeddings given as a dict of chunk_id -> embedding."""
+        rows = [(model, chunk_id, array('d', vector).tobytes()) for chunk_id, vector in embeddings_by_chunk_id.items()]
+        with self.lock, self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+
+_embedding_cache = None
+
+def get_embedding_cache():
+    """Return the process-wide embedding cache, or None if EMBEDDING_CACHE_PATH is unset."""
+    global _embedding_cache
+    cache_path = os.getenv('EMBEDDING_CACHE_PATH')
+    if cache_path and _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(cache_path)
+    return _embedding_cache
+
+def embed_in_batches(embeddings, texts):
+    """
+    Embed texts with one embed_documents call per EMBEDDING_BATCH_SIZE texts,
+    keeping each request under provider size caps. Up to EMBED_CONCURRENCY
+    batches are in flight at once. Output order matches texts.
+    """
+    batch_size = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+    concurrency = int(os.getenv('EMBED_CONCURRENCY', '4'))
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    if concurrency < 2 or len(batches) < 2:
+        return [vector for batch in batches for vector in embeddings.embed_documents(batch)]
+
+    results = [None] * len(batches)
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+        futures = {}
+        for index, batch in enumerate(batches):
+            # Stagger submissions so the batches don't hit the provider's rate limit at the same instant
+            time.sleep(random.uniform(0, 0.05))
+            futures[executor.submit(embeddings.embed_documents, batch)] = index
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+# Worker processes of the multi-GPU embedding pool; each loads its model copy
+# once, on the GPU it is pinned to, and reuses it for every shard
+_embedding_pool = None
+_embedding_pool_key = None
+_worker_embeddings = None
+
+def init_embedding_worker(gpu_ids, embedding_model):
+    """Pin a pool worker to the next free GPU and load its embedding model."""
+    global _worker_embeddings
+    os.environ["CUDA_VISIBLE_DEVICES"] = str(gpu_ids.get())
+    _worker_embeddings, _ = load_embedding_model(embedding_model)
+
+def embed_shard(texts):
+    """Embed one shard of texts on the model loaded by init_embedding_worker."""
+    return embed_in_batches(_worker_embeddings, texts)
+
+def get_embedding_pool(embedding_model, gpu_count):
+    """Return the process-wide embedding pool, starting it on first use or when the model changes."""
+    global _embedding_pool, _embedding_pool_key
+    import torch.multiprocessing as mp
+    if _embedding_pool_key != (embedding_model, gpu_count):
+        shutdown_embedding_pool()
+        context = mp.get_context("spawn")
+        gpu_ids = context.Queue()
+        for gpu_id in range(gpu_count):
+            gpu_ids.put(gpu_id)
+        _embedding_pool = context.Pool(gpu_count, initializer=init_embedding_worker, initargs=(gpu_ids, embedding_model))
+        _embedding_pool_key = (embedding_model, gpu_count)
+    return _embedding_pool
+
+@atexit.register
+def shutdown_embedding_pool():
+    """Stop the multi-GPU embedding pool, if one was started."""
+    global _embedding_pool, _embedding_pool_key
+    if _embedding_pool is not None:
+        _embedding_pool.close()
+        _embedding_pool.join()
+    _embedding_pool = None
+    _embedding_pool_key = None
+
+def embed_documents_multi_gpu(embeddings, embedding_model, texts):
+    """
+    Embed texts, sharding them across all visible GPUs when EMBEDDING_MULTI_GPU is TRUE.
+
+    Only local (sentence-transformer) models are sharded; API-backed models and
+    single-GPU hosts embed on the loaded model in EMBEDDING_BATCH_SIZE batches.
+    Shards run on a pool that lives for the whole process, one worker per GPU.
+    Shard results are concatenated in order, so the output lines up with texts.
+    """
+    gpu_count = 0
+    if os.getenv('EMBEDDING_MULTI_GPU', 'False').upper() == "TRUE" and embedding_model not in ("openai", "vertexai"):
+        import torch
+        gpu_count = torch.cuda.device_count()
+    if gpu_count < 2 or len(texts) < gpu_count:
+        return embed_in_batches(embeddings, texts)
+
+    shard_size = -(-len(texts) // gpu_count)
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+    logging.info(f"Embedding {len(texts)} chunks across {len(shards)} GPUs")
+    results = get_embedding_pool(embedding_model, gpu_count).map(embed_shard, shards, chunksize=1)
+    return [vector for shard_vectors in results for vector in shard_vectors]
+
+# The index only has to be created once per database and dimension; later
+# batches and files would otherwise repeat the DDL round-trip. Graphs are held
+# weakly so closed connections are not kept alive, and the database is read on
+# every call so a wrapper switched to another database still gets its index
+_vector_indexes_created = weakref.WeakKeyDictionary()
+
+def create_vector_index(graph, dimension):
+    created = _vector_indexes_created.setdefault(graph, set())
+    key = (getattr(graph, '_database', None), dimension)
+    if key in created:
+        return
+    # With EMBEDDING_INT8 the index keeps int8-quantized copies of the float
+    # vectors in c.embedding (Neo4j 5.18+); the option only applies when the
+    # index is first created
+    graph.query("""CREATE VECTOR INDEX `vector` if not exists for (c:Chunk) on (c.embedding)
+                    OPTIONS {indexConfig: {
+                    `vector.dimensions`: $dimensions,
+                    `vector.similarity_function`: 'cosine',
+                    `vector.quantization.enabled`: $quantization
+                    }}
+                """,
+                {
+                    "dimensions" : dimension,
+                    "quantization" : os.getenv('EMBEDDING_INT8', 'False').upper() == "TRUE"
+                }
+                )
+    created.add(key)
+
+def get_chunk_embeddings(chunkId_chunkDoc_list):
+    """
+    Return the {chunkId, embeddings} rows for a batch of chunks, or an empty
+    list when IS_EMBEDDING is off. Makes no graph calls, so it can run ahead
+    of the batch that is currently being written.
+    """
+    isEmbedding = os.getenv('IS_EMBEDDING')
+    if isEmbedding.upper() != "TRUE":
+        return []
+    embedding_model = os.getenv('EMBEDDING_MODEL')
+    embeddings, dimension = load_embedding_model(embedding_model)
+    
+    # Reuse cached embeddings and embed the remaining chunks in batched calls
+    embedding_cache = get_embedding_cache()
+    embeddings_by_chunk_id = {}
+    if embedding_cache:
+        embeddings_by_chunk_id = embedding_cache.get_many(embedding_model, [row['chunk_id'] for row in chunkId_chunkDoc_list])
+    uncached_rows = [row for row in chunkId_chunkDoc_list if row['chunk_id'] not in embeddings_by_chunk_id]
+    if uncached_rows:
+        texts = [row['chunk_doc'].page_content for row in uncached_rows]
+        embeddings_list = embed_documents_multi_gpu(embeddings, embedding_model, texts)
+        new_embeddings = {row['chunk_id']: embeddings_arr for row, embeddings_arr in zip(uncached_rows, embeddings_list)}
+        if embedding_cache:
+            embedding_cache.put_many(embedding_model, new_embeddings)
+        embeddings_by_chunk_id.update(new_embeddings)
+    logging.info(f"Embedded {len(uncached_rows)} chunks, {len(chunkId_chunkDoc_list) - len(uncached_rows)} from cache")
+    return [
+        {"chunkId": row['chunk_id'], "embeddings": embeddings_by_chunk_id[row['chunk_id']]}
+        for row in chunkId_chunkDoc_list
+    ]
+
+def update_embedding_create_vector_index(graph, chunkId_chunkDoc_list, file_name, embeddings_future=None):
     #create embedding
     isEmbedding = os.getenv('IS_EMBEDDING')
     embedding_model = os.getenv('EMBEDDING_MODEL')
     
     embeddings, dimension = load_embedding_model(embedding_model)
     logging.info(f'embedding model:{embeddings} and dimesion:{dimension}')
-    data_for_query = []
     logging.info(f"update embedding and vector index for chunks")
     if isEmbedding.upper() == "TRUE":
-        for row in chunkId_chunkDoc_list:
-        # for graph_document in row['graph_doc']:
-            embeddings_arr = embeddings.embed_query(row['chunk_doc'].page_content)
-            # logging.info(f'Embedding list {embeddings_arr}')
-                                    
-            data_for_query.append({
-                "chunkId": row['chunk_id'],
-                "embeddings": embeddings_arr
-            })
-            # graph.query("""MATCH (d:Document {fileName : $fileName})
-            #                MERGE (c:Chunk {id:$chunkId}) SET c.embedding = $embeddings 
-            #                MERGE (c)-[:PART_OF]->(d)
-            #             """,
-            #             {
-            #                 "fileName" : file_name,
-            #                 "chunkId": row['chunk_id'],
-            #                 "embeddings" : embeddings_arr
-            #             }
-            #             )
-            # logging.info('create vector index on chunk embedding')
-
-            graph.query("""CREATE VECTOR INDEX `vector` if not exists for (c:Chunk) on (c.embedding)
-                            OPTIONS {indexConfig: {
-                            `vector.dimensions`: $dimensions,
-                            `vector.similarity_function`: 'cosine'
-                            }}
-                        """,
-                        {
-                            "dimensions" : dimension
-                        }
-                        )
-    
+        create_vector_index(graph, dimension)
+    # The embeddings may already have been prefetched by processing_source
+    if embeddings_future is not None:
+        data_for_query = embeddings_future.result()
+    else:
+        data_for_query = get_chunk_embeddings(chunkId_chunkDoc_list)
     query_to_create_embedding = """
         UNWIND $data AS row
         MATCH (d:Document {fileName: $fileName})
@@ -200,56 +361,54 @@ def update_embedding_create_vector_index(graph, chunkId_chunkDoc_list, file_name
     graph.query(query_to_create_embedding, params={"fileName":file_name, "data":data_for_query})
 
 def merge_relationship_between_chunk_and_entites(graph: Neo4jGraph, graph_documents_chunk_chunk_Id : list):
-    batch_data = []
     logging.info("Create HAS_ENTITY relationship between chunks and entities")
-    chunk_node_id_set = 'id:"{}"'
+    # Labels can't be query parameters, so rows are grouped per label and each
+    # group gets a statically labelled MERGE that can use that label's index
+    batch_data_by_label = defaultdict(list)
     for graph_doc_chunk_id in graph_documents_chunk_chunk_Id:
         for node in graph_doc_chunk_id['graph_doc'].nodes:
-            query_data={
+            batch_data_by_label[node.type].append({
                 'chunk_id': graph_doc_chunk_id['chunk_id'],
-                'node_type': node.type,
                 'node_id': node.id
-            }
-            batch_data.append(query_data)
-            #node_id = node.id
-            #Below query is also unable to change as parametrize because we can't make parameter of Label or node type
-            #https://neo4j.com/docs/cypher-manual/current/syntax/parameters/
-            #graph.query('MATCH(c:Chunk {'+chunk_node_id_set.format(graph_doc_chunk_id['chunk_id'])+'}) MERGE (n:'+ node.type +'{ id: "'+node_id+'"}) MERGE (c)-[:HAS_ENTITY]->(n)')
-          
-    if batch_data:
-        unwind_query = """
-                    UNWIND $batch_data AS data
-                    MATCH (c:Chunk {id: data.chunk_id})
-                    CALL apoc.merge.node([data.node_type], {id: data.node_id}) YIELD node AS n
-                    MERGE (c)-[:HAS_ENTITY]->(n)
-                """
-        graph.query(unwind_query, params={"batch_data": batch_data})
+            })
+    if not batch_data_by_label:
+        return
+
+    # All labels are written by one query, as unit subqueries, so the whole
+    # batch is a single round-trip and a single commit
+    subqueries = []
+    params = {}
+    for index, (node_type, batch_data) in enumerate(batch_data_by_label.items()):
+        label = node_type.replace('`', '``')
+        subqueries.append(f"""
+                    CALL {{
+                        UNWIND $batch_data_{index} AS data
+                        MATCH (c:Chunk {{id: data.chunk_id}})
+                        MERGE (n:`{label}` {{id: data.node_id}})
+                        MERGE (c)-[:HAS_ENTITY]->(n)
+                    }}""")
+        params[f"batch_data_{index}"] = batch_data
+    graph.query("".join(subqueries), params=params)
         
-def processing_chunks(chunkId_chunkDoc_list,graph,file_name,model,allowedNodes,allowedRelationship, node_count, rel_count):
-    #create vector index and update chunk node with embedding
-    update_embedding_create_vector_index( graph, chunkId_chunkDoc_list, file_name)
-    logging.info("Get graph document list from models")
-    graph_documents =  generate_graphDocuments(model, graph, chunkId_chunkDoc_list, allowedNodes, allowedRelationship)
+def processing_chunks(chunkId_chunkDoc_list,graph,file_name,model,allowedNodes,allowedRelationship, node_count, rel_count, embeddings_future=None):
+    # Embedding and LLM graph extraction are independent, so run them concurrently;
+    # the Neo4j driver behind Neo4jGraph is safe to share between threads
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        #create vector index and update chunk node with embedding
+        embedding_future = executor.submit(update_embedding_create_vector_index, graph, chunkId_chunkDoc_list, file_name, embeddings_future)
+        logging.info("Get graph document list from models")
+        graph_documents_future = executor.submit(generate_graphDocuments, model, graph, chunkId_chunkDoc_list, allowedNodes, allowedRelationship)
+        embedding_future.result()
+        graph_documents = graph_documents_future.result()
     save_graphDocuments_in_neo4j(graph, graph_documents)
     chunks_and_graphDocuments_list = get_chunk_and_graphDocument(graph_documents, chunkId_chunkDoc_list)
     merge_relationship_between_chunk_and_entites(graph, chunks_and_graphDocuments_list)
     # return graph_documents
     
-    distinct_nodes = set()
-    relations = []
-    for graph_document in graph_documents:
-        #get distinct nodes
-        for node in graph_document.nodes:
-            node_id = node.id
-            node_type= node.type
-            if (node_id, node_type) not in distinct_nodes:
-                distinct_nodes.add((node_id, node_type))
-    #get all relations
-    for relation in graph_document.relationships:
-            relations.append(relation.type)
+    distinct_nodes = {(node.id, node.type) for graph_document in graph_documents for node in graph_document.nodes}
 
     node_count += len(distinct_nodes)
-    rel_count += len(relations)
+    rel_count += sum(len(graph_document.relationships) for graph_document in graph_documents)
     print(f'node count internal func:{node_count}')
     print(f'relation count internal func:{rel_count}')
     return node_count,rel_count
@@ -279,15 +438,9 @@ def processing_source(graph, model, file_name, pages, allowedNodes, allowedRelat
   logging.info("Break down file into chunks")
   
   
-  bad_chars = ['"', "\n", "'"]
   for i in range(0,len(pages)):
-    text = pages[i].page_content
-    for j in bad_chars:
-      if j == '\n':
-        text = text.replace(j, ' ')
-      else:
-        text = text.replace(j, '')
-    pages[i]=Document(page_content=str(text), metadata=pages[i].metadata)
+    text = pages[i].page_content.translate(BAD_CHARS_TABLE)
+    pages[i]=Document(page_content=text, metadata=pages[i].metadata)
 
   create_chunks_obj = CreateChunksofDocument(pages, graph)
   
@@ -310,41 +463,38 @@ def processing_source(graph, model, file_name, pages, allowedNodes, allowedRelat
     logging.info('Update the status as Processing')
     update_graph_chunk_processed = int(os.environ.get('UPDATE_GRAPH_CHUNKS_PROCESSED'))
     # selected_chunks = []
-    is_cancelled_status = False
     job_status = "Completed"
     node_count = 0
     rel_count = 0
+    # Refreshed by each progress update, so the loop needs no separate status query
+    is_cancelled_status = result[0]['is_cancelled']
+    # Each batch's embeddings are computed in the background while the previous
+    # batch is still waiting on the LLM and Neo4j
+    prefetch_executor = ThreadPoolExecutor(max_workers=1)
+    embeddings_future = prefetch_executor.submit(get_chunk_embeddings, chunkId_chunkDoc_list[:update_graph_chunk_processed])
     for i in range(0, len(chunkId_chunkDoc_list), update_graph_chunk_processed):
         select_chunks_upto = i+update_graph_chunk_processed
         logging.info(f'Selected Chunks upto: {select_chunks_upto}')
         if len(chunkId_chunkDoc_list) <= select_chunks_upto:
             select_chunks_upto = len(chunkId_chunkDoc_list)
         selected_chunks = chunkId_chunkDoc_list[i:select_chunks_upto]
-        result = graphDb_data_Access.get_current_status_document_node(file_name)
-        keys = str(result[0].keys())
-        logging.info(f"RESULT KEYS: {keys}")
-        is_cancelled_status = result[0]['is_cancelled']
-        logging.info(f"Value of is_cancelled : {result[0]['is_cancelled']}")
+        logging.info(f"Value of is_cancelled : {is_cancelled_status}")
         if bool(is_cancelled_status) == True:
             job_status = "Cancelled"
             logging.info('Exit from running loop of processing file')
-            exit
+            break
         else:
-            node_count,rel_count = processing_chunks(selected_chunks,graph,file_name,model,allowedNodes,allowedRelationship,node_count, rel_count)
+            next_embeddings_future = None
+            if select_chunks_upto < len(chunkId_chunkDoc_list):
+                next_embeddings_future = prefetch_executor.submit(get_chunk_embeddings, chunkId_chunkDoc_list[select_chunks_upto:select_chunks_upto+update_graph_chunk_processed])
+            node_count,rel_count = processing_chunks(selected_chunks,graph,file_name,model,allowedNodes,allowedRelationship,node_count, rel_count, embeddings_future)
+            embeddings_future = next_embeddings_future
             end_time = datetime.now()
             processed_time = end_time - start_time
-            
-            obj_source_node = sourceNode()
-            obj_source_node.file_name = file_name
-            obj_source_node.updated_at = end_time
-            obj_source_node.processing_time = processed_time
-            obj_source_node.node_count = node_count
-            obj_source_node.processed_chunk = select_chunks_upto
-            obj_source_node.relationship_count = rel_count
-            graphDb_data_Access.update_source_node(obj_source_node)
+            is_cancelled_status = graphDb_data_Access.update_progress(file_name, end_time, processed_time, node_count, select_chunks_upto, rel_count)
+    prefetch_executor.shutdown(wait=False)
     
-    result = graphDb_data_Access.get_current_status_document_node(file_name)
-    is_cancelled_status = result[0]['is_cancelled']
+    is_cancelled_status = graphDb_data_Access.is_cancelled(file_name)
     if bool(is_cancelled_status) == True:
         logging.info(f'Is_cancelled True at the end extraction')
         job_status = 'Cancelled'
@@ -403,20 +553,146 @@ def extract_graph_from_web_page(graph, model, source_url, allowedNodes, allowedR
 
     return processing_source(graph, model, file_name, pages, allowedNodes, allowedRelationship)
 
-def create_source_node_graph_dfrobot_url(graph, model, source_url, source_type):
+def processing_web_pages(graph, model, sources, allowedNodes, allowedRelationship):
+  """
+   Extracts the graph for a group of small web pages in one pass.
+
+   The chunks of all pages are pooled before they are combined into LLM
+   prompts, so short pages share requests instead of each paying for its own
+   round-trip. The pooled chunks are processed UPDATE_GRAPH_CHUNKS_PROCESSED at
+   a time like in processing_source, with progress updates and cancellation
+   checks after every batch. Embeddings and chunk nodes are still written per page.
+
+   Args:
+     sources: list of (file_name, pages) tuples, one per web page
+
+   Returns:
+     List of the per-page result dicts returned by processing_source.
+  """
+  start_time = datetime.now()
+  graphDb_data_Access = graphDBdataAccess(graph)
+
+  chunks_by_file = {}
+  cancelled_files = set()
+  for file_name, pages in sources:
+    result = graphDb_data_Access.get_current_status_document_node(file_name)
+    if result[0]['Status'] == 'Processing':
+      logging.info(f'File {file_name} does not process because it\'s already in Processing status')
+      continue
+    if bool(result[0]['is_cancelled']):
+      cancelled_files.add(file_name)
+    pages = [Document(page_content=page.page_content.translate(BAD_CHARS_TABLE), metadata=page.metadata) for page in pages]
+    chunks = CreateChunksofDocument(pages, graph).split_file_into_chunks()
+    chunks_by_file[file_name] = create_relation_between_chunks(graph, file_name, chunks)
+
+    obj_source_node = sourceNode()
+    obj_source_node.file_name = file_name
+    obj_source_node.status = "Processing"
+    obj_source_node.total_chunks = len(chunks)
+    obj_source_node.total_pages = len(pages)
+    obj_source_node.model = model
+    graphDb_data_Access.update_source_node(obj_source_node)
+  if not chunks_by_file:
+    return []
+
+  update_graph_chunk_processed = int(os.environ.get('UPDATE_GRAPH_CHUNKS_PROCESSED'))
+  # Each row carries its file, so entities are attributed by (file, chunk id)
+  # even when two pages share a chunk
+  pending_chunks = [
+      {**chunk, 'file_name': file_name}
+      for file_name, chunk_list in chunks_by_file.items() if file_name not in cancelled_files
+      for chunk in chunk_list
+  ]
+  processed_chunks = defaultdict(int)
+  distinct_nodes = defaultdict(set)
+  distinct_rels = defaultdict(set)
+  while pending_chunks:
+    selected_chunks = pending_chunks[:update_graph_chunk_processed]
+    pending_chunks = pending_chunks[update_graph_chunk_processed:]
+    selected_chunks_by_file = defaultdict(list)
+    for chunk in selected_chunks:
+      selected_chunks_by_file[chunk['file_name']].append(chunk)
+
+    with ThreadPoolExecutor(max_workers=len(selected_chunks_by_file) + 1) as executor:
+      embedding_futures = [
+          executor.submit(update_embedding_create_vector_index, graph, chunk_list, file_name)
+          for file_name, chunk_list in selected_chunks_by_file.items()
+      ]
+      graph_documents_future = executor.submit(generate_graphDocuments, model, graph, selected_chunks, allowedNodes, allowedRelationship)
+      for embedding_future in embedding_futures:
+        embedding_future.result()
+      graph_documents = graph_documents_future.result()
+    save_graphDocuments_in_neo4j(graph, graph_documents)
+    merge_relationship_between_chunk_and_entites(graph, get_chunk_and_graphDocument(graph_documents, selected_chunks))
+
+    # A prompt may span several pages; its entities count towards every page
+    # it covers, deduplicated per page
+    for graph_document in graph_documents:
+      nodes = {(node.id, node.type) for node in graph_document.nodes}
+      rels = {(rel.source.id, rel.type, rel.target.id) for rel in graph_document.relationships}
+      for file_name in set(graph_document.source.metadata['combined_chunk_files']):
+        distinct_nodes[file_name].update(nodes)
+        distinct_rels[file_name].update(rels)
+
+    end_time = datetime.now()
+    processed_time = end_time - start_time
+    for file_name, chunk_list in selected_chunks_by_file.items():
+      processed_chunks[file_name] += len(chunk_list)
+      is_cancelled_status = graphDb_data_Access.update_progress(file_name, end_time, processed_time, len(distinct_nodes[file_name]), processed_chunks[file_name], len(distinct_rels[file_name]))
+      if bool(is_cancelled_status):
+        logging.info(f'Exit from running loop of processing file {file_name}')
+        cancelled_files.add(file_name)
+    if cancelled_files:
+      pending_chunks = [chunk for chunk in pending_chunks if chunk['file_name'] not in cancelled_files]
+
+  end_time = datetime.now()
+  processed_time = end_time - start_time
+  results = []
+  for file_name in chunks_by_file:
+    node_count = len(distinct_nodes[file_name])
+    rel_count = len(distinct_rels[file_name])
+    if file_name in cancelled_files or graphDb_data_Access.is_cancelled(file_name):
+      job_status = 'Cancelled'
+    else:
+      job_status = 'Completed'
+    obj_source_node = sourceNode()
+    obj_source_node.file_name = file_name
+    obj_source_node.status = job_status
+    obj_source_node.processing_time = processed_time
+    graphDb_data_Access.update_source_node(obj_source_node)
+    logging.info(f'file:{file_name} extraction has been completed')
+    results.append({
+        "fileName": file_name,
+        "nodeCount": node_count,
+        "relationshipCount": rel_count,
+        "processingTime": round(processed_time.total_seconds(),2),
+        "status" : job_status,
+        "model" : model,
+        "success_count" : 1
+    })
+  return results
+
+def extract_graph_from_web_pages(graph, model, source_urls, allowedNodes, allowedRelationship, max_workers=8):
+    """Load a group of web pages concurrently and extract their graph with pooled LLM prompts."""
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        loaded = list(executor.map(get_documents_from_web_page, source_urls))
+    sources = []
+    for source_url, (file_name, pages) in zip(source_urls, loaded):
+        if pages==None or len(pages)==0:
+            logging.error(f'Content is not available for given URL : {source_url}')
+            continue
+        sources.append((file_name, pages))
+    return processing_web_pages(graph, model, sources, allowedNodes, allowedRelationship)
+
+def get_source_node_dfrobot_url(model, source_url, source_type):
+    """Load a company web page and describe it as a source node, without writing it."""
     if "dfrobot" not in source_url:
-        failed_count+=1
         message = f"Not a URL for Company : {source_url}"
         raise Exception(message)
     
-    success_count=0
-    failed_count=0
-    lst_file_name = []
-    
     pages = WebBaseLoader(source_url, verify_ssl=False).load()
     
     if pages==None or len(pages)==0:
-        failed_count+=1
         message = f"Unable to read data for given url : {source_url}"
         raise Exception(message)
     try:
@@ -430,18 +706,60 @@ def create_source_node_graph_dfrobot_url(graph, model, source_url, source_type):
         obj_source_node.file_name = pages[0].metadata['title']
         obj_source_node.language = pages[0].metadata['language'] 
         obj_source_node.file_size = sys.getsizeof(pages[0].page_content)
-    
-    
+        return obj_source_node
+    except Exception as e:
+        logging.error(f"Error processing source node: {str(e)}. Received metadata {str(pages[0].metadata)}")
+        raise
+
+def create_source_node_graph_dfrobot_url(graph, model, source_url, source_type):
+    try:
+        obj_source_node = get_source_node_dfrobot_url(model, source_url, source_type)
         graphDb_data_Access = graphDBdataAccess(graph)
         graphDb_data_Access.create_source_node(obj_source_node)
-        lst_file_name.append({'fileName':obj_source_node.file_name,'fileSize':obj_source_node.file_size,'url':obj_source_node.url,'status':'Success'})
-        success_count+=1
-        return lst_file_name,success_count,failed_count
+        lst_file_name = [{'fileName':obj_source_node.file_name,'fileSize':obj_source_node.file_size,'url':obj_source_node.url,'status':'Success'}]
+        return lst_file_name,1,0
     
     except Exception as e:
-        logging.error(f"Error processing source node: {str(e)}. Received metadata {str(pages[0].metadata)}")
+        logging.error(f"Error creating source node for {source_url}: {str(e)}")
         return None, 0, 1
 
+def create_source_nodes_graph_dfrobot_urls(graph, model, source_urls, source_type, max_workers=8):
+    """
+    Create the source nodes for a batch of company URLs. Pages are loaded
+    concurrently and all nodes are written in one transaction.
+    """
+    def load(source_url):
+        try:
+            return get_source_node_dfrobot_url(model, source_url, source_type)
+        except Exception as e:
+            logging.error(f"Error creating source node for {source_url}: {str(e)}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        obj_source_nodes = [node for node in executor.map(load, source_urls) if node is not None]
+    failed_count = len(source_urls) - len(obj_source_nodes)
+    if not obj_source_nodes:
+        return [], 0, failed_count
+
+    graphDb_data_Access = graphDBdataAccess(graph)
+    graphDb_data_Access.create_source_nodes(obj_source_nodes)
+    lst_file_name = [
+        {'fileName':node.file_name,'fileSize':node.file_size,'url':node.url,'status':'Success'}
+        for node in obj_source_nodes
+    ]
+    return lst_file_name,len(obj_source_nodes),failed_count
+
+def count_json_items(source_json_path):
+    """
+    Count the items of the top-level JSON array in a file. With ijson the
+    array is streamed rather than loaded, so memory stays flat for large files.
+    """
+    if IJSON_AVAILABLE:
+        with open(source_json_path, 'rb') as file:
+            return sum(1 for _ in ijson.items(file, 'item'))
+    with open(source_json_path, 'r', encoding='utf-8') as file:
+        return len(json.load(file))
+
 def create_source_node_graph_json(graph, model, source_json_path):
     """
     Processes the provided JSON file to create a source node in a graph.
@@ -458,20 +776,18 @@ def create_source_node_graph_json(graph, model, source_json_path):
     """
 
     result = {'fileName': '', 'fileSize': 0, 'url': '', 'status': ''}
+    total_pages = 0
+    failed_count = 0
 
     try:
-        # Load JSON content from the file
-        with open(source_json_path, 'r', encoding='utf-8') as file:
-            content = json.load(file)
-
         logging.info(f'Creating source node for JSON file: {source_json_path}')
 
         # Calculate or retrieve file details
         file_name = source_json_path # Extract file name from path
         file_size = os.path.getsize(source_json_path)  # Get the file size in bytes
+        result['fileSize'] = file_size
         url = file_name
-        total_pages = len(content)  #assuming each item is a page
-        failed_count = 0
+        total_pages = count_json_items(source_json_path)  #assuming each item is a page
         if total_pages in [None, 0]:
             failed_count += 1
             message = f"Unable to read data for given Json file : {file_name}"
@@ -520,7 +836,7 @@ def merge_chunks_local(file_name, total_chunks, chunk_dir, merged_dir):
             chunk_file_path = os.path.join(chunk_dir, f"{file_name}_part_{i}")
             logging.info(f'Chunk File Path While Merging Parts:{chunk_file_path}')
             with open(chunk_file_path, "rb") as chunk_file:
-                shutil.copyfileobj(chunk_file, write_stream)
+                copy_file_contents(chunk_file, write_stream, MERGE_COPY_BUFFER_SIZE)
             os.unlink(chunk_file_path)  # Delete the individual chunk file after merging
     logging.info("Chunks merged successfully and return file size")
     file_name, pages, _ = get_documents_from_file_by_path(merged_file_path,file_name)
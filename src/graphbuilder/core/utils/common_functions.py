@@ -9,8 +9,10 @@ Original File: shared/common_fn.py
 New Location: src/graphbuilder/core/utils/common_functions.py
 """
 
+import functools
 import hashlib
 import logging
+import threading
 
 from modelscope import snapshot_download
 from langchain_community.embeddings.sentence_transformer import SentenceTransformerEmbeddings
@@ -63,14 +65,38 @@ def get_chunk_and_graphDocument(graph_document_list, chunkId_chunkDoc_list):
                   
   return lst_chunk_chunkId_document  
                  
+# One driver, and so one connection pool, per database for the life of the
+# process; each query borrows a pooled connection instead of opening its own.
+# Entries are keyed without the password, which is only kept as a digest to
+# notice when it changes; the replaced graph's driver is closed
+_graph_connections = {}
+_graph_connections_lock = threading.Lock()
+
 def create_graph_database_connection(uri, userName, password, database):
+  key = (uri, userName, database)
+  password_digest = hashlib.blake2b((password or "").encode(), digest_size=16).digest()
+  with _graph_connections_lock:
+    entry = _graph_connections.get(key)
+    if entry and entry[0] == password_digest:
+      return entry[1]
+    graph = _open_graph_database_connection(uri, userName, password, database)
+    _graph_connections[key] = (password_digest, graph)
+  if entry:
+    entry[1]._driver.close()
+  return graph
+
+def _open_graph_database_connection(uri, userName, password, database):
   enable_user_agent = os.environ.get("ENABLE_USER_AGENT", "False").lower() in ("true", "1", "yes")
+  # Sized for the crawler's extraction threads, each of which may write concurrently
+  driver_config = {'max_connection_pool_size': int(os.environ.get('NEO4J_MAX_CONNECTION_POOL_SIZE', '64'))}
   if enable_user_agent:
-    graph = Neo4jGraph(url=uri, database=database, username=userName, password=password, refresh_schema=False, sanitize=True,driver_config={'user_agent':os.environ.get('NEO4J_USER_AGENT')})  
-  else:
-    graph = Neo4jGraph(url=uri, database=database, username=userName, password=password, refresh_schema=False, sanitize=True)    
+    driver_config['user_agent'] = os.environ.get('NEO4J_USER_AGENT')
+  graph = Neo4jGraph(url=uri, database=database, username=userName, password=password, refresh_schema=False, sanitize=True, driver_config=driver_config)
   return graph
 
+# Loaded models are kept for the life of the process so repeated batches
+# don't reload weights
+@functools.lru_cache(maxsize=4)
 def load_embedding_model(embedding_model_name: str):
     if embedding_model_name.startswith("iic"):
         local_dir = "../data/embedding/"
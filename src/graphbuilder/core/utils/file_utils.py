@@ -0,0 +1,31 @@
+"""File helpers shared by the upload pipeline and the migration script."""
+
+import os
+import shutil
+import sys
+
+
+def copy_file_contents(src, dst, buffer_size=1 << 20):
+    """
+    Append the rest of binary file src to binary file dst.
+
+    On Linux the bytes are copied in-kernel with sendfile(2), which accepts a
+    regular file as destination. If sendfile fails or stops short, for
+    example because src was truncated after its size was read, the remainder
+    is copied with shutil.copyfileobj.
+    """
+    dst.flush()
+    if sys.platform.startswith('linux'):
+        size = os.fstat(src.fileno()).st_size
+        offset = src.tell()
+        try:
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            pass
+        # sendfile with an explicit offset leaves the position of src unchanged
+        src.seek(offset)
+    shutil.copyfileobj(src, dst, buffer_size)
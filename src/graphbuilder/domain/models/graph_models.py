@@ -6,6 +6,7 @@ and provide type-safe, validated entities for the knowledge graph domain.
 """
 
 import uuid
+from array import array
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Set, Any, Union
 from dataclasses import dataclass, field
@@ -446,6 +447,50 @@ class DocumentChunk(DomainEntity):
         }
 
 
+@dataclass
+class DocumentChunkBatch:
+    """
+    Columnar batch of chunks cut from a single document.
+    
+    Chunk fields are held as parallel columns, with compact integer arrays for
+    the numeric ones, instead of one DocumentChunk object per window.
+    Individual chunks are only materialized at persistence boundaries.
+    """
+    
+    document_id: str
+    contents: List[str] = field(default_factory=list)
+    starts: array = field(default_factory=lambda: array('i'))
+    ends: array = field(default_factory=lambda: array('i'))
+    token_counts: array = field(default_factory=lambda: array('i'))
+    
+    def __len__(self) -> int:
+        return len(self.contents)
+    
+    def append(self, content: str, start: int, end: int, token_count: int) -> None:
+        """Append one chunk to every column."""
+        self.contents.append(content)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.token_counts.append(token_count)
+    
+    def to_chunks(self) -> List[DocumentChunk]:
+        """Materialize the batch as DocumentChunk entities in chunk order."""
+        return [
+            DocumentChunk(
+                content=content,
+                document_id=self.document_id,
+                chunk_index=chunk_index,
+                token_count=token_count,
+                character_count=end - start,
+                start_position=start,
+                end_position=end
+            )
+            for chunk_index, (content, start, end, token_count) in enumerate(
+                zip(self.contents, self.starts, self.ends, self.token_counts)
+            )
+        ]
+
+
 @dataclass
 class SourceDocument(DomainEntity):
     """
@@ -93,6 +93,12 @@ class LLMConfiguration:
     retry_delay: float = field(default_factory=lambda: float(os.getenv("LLM_RETRY_DELAY", "1.0")))
     requests_per_minute: int = field(default_factory=lambda: int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")))
     
+    # Response caching
+    response_cache_enabled: bool = field(default_factory=lambda: os.getenv("LLM_RESPONSE_CACHE", "true").lower() == "true")
+    response_cache_directory: str = field(default_factory=lambda: os.getenv("LLM_RESPONSE_CACHE_DIR", "data/cache/llm"))
+    response_cache_ttl: int = field(default_factory=lambda: int(os.getenv("LLM_RESPONSE_CACHE_TTL", "604800")))  # 7 days
+    prompt_version: str = field(default_factory=lambda: os.getenv("LLM_PROMPT_VERSION", "1"))
+    
     # Fallback models
     fallback_models: List[str] = field(default_factory=lambda: os.getenv("LLM_FALLBACK_MODELS", "").split(",") if os.getenv("LLM_FALLBACK_MODELS") else [])
 
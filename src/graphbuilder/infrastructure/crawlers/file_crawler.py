@@ -19,6 +19,12 @@ from langchain_community.document_loaders import UnstructuredFileLoader
 from langchain_core.documents import Document
 import json
 
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 
 def load_document_content(file_path):
     """
@@ -35,21 +41,33 @@ def load_document_content(file_path):
         return PyMuPDFLoader(file_path)  # Assuming PyMuPDFLoader is defined elsewhere
     elif Path(file_path).suffix.lower() == '.json':
         print("in else: JSON")
-        # For JSON, we just load it using Python's json module
-        with open(file_path, 'r', encoding="utf-8") as file:
-            content = json.load(file)
-        return content  # Returning the loaded JSON content directly
+        # For JSON, the items of the top-level list are returned one by one
+        return iter_json_items(file_path)
     else:
         print("in else: Other format")
         return UnstructuredFileLoader(file_path, encoding="utf-8", mode="elements")
 
+def iter_json_items(file_path):
+    """
+    Yield the items of the top-level JSON array in a file. With ijson the
+    file is parsed incrementally, so the whole document is never held in
+    memory at once.
+    """
+    if IJSON_AVAILABLE:
+        with open(file_path, 'rb') as file:
+            yield from ijson.items(file, 'item')
+    else:
+        with open(file_path, 'r', encoding="utf-8") as file:
+            yield from json.load(file)
+
 def process_json_to_pages(json_data, file):
     """
     Processes the JSON data to convert each item into a page representation, 
     while maintaining the structure of the data and including metadata like page numbers.
     
     Args:
-        json_data (list): List of dictionaries representing the JSON data.
+        json_data (iterable): Dictionaries representing the JSON data; may be a
+            generator, which is consumed once.
     
     Returns:
         list: List of pages, each with a 'page_number', 'content', and 'metadata' field.
@@ -59,9 +77,6 @@ def process_json_to_pages(json_data, file):
     page_content = ''
     metadata = {}
 
-    # Calculate total pages (you can adjust the logic depending on the JSON structure)
-    total_pages = len(json_data)
-    
     for idx, item in enumerate(json_data):
         # Initialize page structure
         page_content = {"page_number": page_number, "content": {}}
@@ -80,8 +95,7 @@ def process_json_to_pages(json_data, file):
             'source': f"source_{page_number}",  
             'page_number': page_number,
             'filename': file,  
-            'filetype': 'json', 
-            'total_pages': total_pages
+            'filetype': 'json'
         }
         
         print("JSON filename:", file)
@@ -89,6 +103,11 @@ def process_json_to_pages(json_data, file):
         pages.append(Document(page_content = str(page_content), metadata=page_metadata))
         page_number += 1
     
+    # The item count is only known once the input has been consumed
+    total_pages = len(pages)
+    for page in pages:
+        page.metadata['total_pages'] = total_pages
+    
     return pages
 
     
@@ -36,23 +36,39 @@ class graphDBdataAccess:
     def create_source_node(self, obj_source_node: sourceNode):
         
         try:
-            job_status = "New"
-            logging.info("creating source node if does not exist")
-            self.graph.query("""MERGE(d:Document {fileName :$fn}) SET d.fileSize = $fs, d.fileType = $ft ,
-                            d.status = $st, d.url = $url, d.awsAccessKeyId = $awsacc_key_id, 
-                            d.fileSource = $f_source, d.createdAt = $c_at, d.updatedAt = $u_at, 
-                            d.processingTime = $pt, d.errorMessage = $e_message, d.nodeCount= $n_count, 
-                            d.relationshipCount = $r_count, d.model= $model, d.language= $language,
+            self.create_source_nodes([obj_source_node])
+        except Exception as e:
+            error_message = str(e)
+            self.update_exception_db(obj_source_node.file_name, error_message)
+            raise Exception(error_message)
+
+    def create_source_nodes(self, obj_source_nodes):
+        """
+        Create several source nodes with a single UNWIND, so a batch of
+        documents costs one round-trip and one commit.
+        """
+        job_status = "New"
+        logging.info(f"creating {len(obj_source_nodes)} source nodes if they do not exist")
+        rows = [
+            {"fn": obj_source_node.file_name, "fs": obj_source_node.file_size, "ft": obj_source_node.file_type,
+             "st": job_status, "url": obj_source_node.url, "awsacc_key_id": obj_source_node.awsAccessKeyId,
+             "f_source": obj_source_node.file_source, "c_at": obj_source_node.created_at, "u_at": obj_source_node.created_at,
+             "pt": 0, "e_message": '', "n_count": 0, "r_count": 0, "model": obj_source_node.model,
+             "language": obj_source_node.language}
+            for obj_source_node in obj_source_nodes
+        ]
+        try:
+            self.graph.query("""UNWIND $rows AS row
+                            MERGE(d:Document {fileName :row.fn}) SET d.fileSize = row.fs, d.fileType = row.ft ,
+                            d.status = row.st, d.url = row.url, d.awsAccessKeyId = row.awsacc_key_id, 
+                            d.fileSource = row.f_source, d.createdAt = row.c_at, d.updatedAt = row.u_at, 
+                            d.processingTime = row.pt, d.errorMessage = row.e_message, d.nodeCount= row.n_count, 
+                            d.relationshipCount = row.r_count, d.model= row.model, d.language= row.language,
                             d.is_cancelled=False, d.total_chunks=0, d.processed_chunk=0""",
-                             {"fn": obj_source_node.file_name, "fs": obj_source_node.file_size, "ft": obj_source_node.file_type,
-                              "st": job_status, "url": obj_source_node.url, "awsacc_key_id": obj_source_node.awsAccessKeyId,
-                              "f_source": obj_source_node.file_source, "c_at": obj_source_node.created_at, "u_at": obj_source_node.created_at,
-                              "pt": 0, "e_message": '', "n_count": 0, "r_count": 0, "model": obj_source_node.model,
-                              "language": obj_source_node.language})
+                             {"rows": rows})
         except Exception as e:
             error_message = str(e)
             logging.info(f"error_message = {error_message}")
-            self.update_exception_db(obj_source_node.file_name, error_message)
             raise Exception(error_message)
 
     def update_source_node(self, obj_source_node: sourceNode):
@@ -86,6 +102,29 @@ class graphDBdataAccess:
             self.update_exception_db(obj_source_node.file_name, error_message)
             raise Exception(error_message)
 
+    def update_progress(self, file_name, updated_at, processing_time, node_count, processed_chunk, rel_count):
+        """
+        Set the progress properties of a document node after a batch of chunks
+        and return its is_cancelled flag in the same round-trip.
+        """
+        try:
+            params = {
+                'updatedAt': updated_at,
+                'processingTime': round(processing_time.total_seconds(), 2),
+                'nodeCount': node_count,
+                'relationshipCount': rel_count,
+                'processed_chunk': processed_chunk,
+            }
+            param = {"fileName": file_name, "props": params}
+            query = "MERGE(d:Document {fileName :$fileName}) SET d += $props RETURN d.is_cancelled AS is_cancelled"
+            logging.info("Updating source node progress")
+            result = self.graph.query(query, param)
+            return bool(result[0]['is_cancelled']) if result else False
+        except Exception as e:
+            error_message = str(e)
+            self.update_exception_db(file_name, error_message)
+            raise Exception(error_message)
+
     def get_source_list(self):
         """
         Get all document nodes from the database, focusing on metadata.
@@ -106,6 +145,11 @@ class graphDBdataAccess:
         param = {"file_name" : file_name}
         return self.execute_query(query, param)
 
+    def is_cancelled(self, file_name):
+        query = "MATCH(d:Document {fileName : $file_name}) RETURN d.is_cancelled AS is_cancelled"
+        result = self.execute_query(query, {"file_name" : file_name})
+        return bool(result[0]['is_cancelled']) if result else False
+
     def execute_query(self, query, param=None):
         return self.graph.query(query, param)
 
@@ -7,11 +7,11 @@ for document and chunk persistence with advanced querying capabilities.
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, AsyncGenerator
+from typing import Dict, List, Optional, Any, AsyncGenerator, Union
 from datetime import datetime, timezone
 from abc import ABC, abstractmethod
 
-from ...domain.models.graph_models import SourceDocument, DocumentChunk
+from ...domain.models.graph_models import SourceDocument, DocumentChunk, DocumentChunkBatch
 from ...domain.models.processing_models import ProcessingStatus
 from ..config.settings import GraphBuilderConfig
 
@@ -49,6 +49,14 @@ class DocumentRepositoryInterface(ABC):
         """Save a document chunk."""
         pass
     
+    @abstractmethod
+    async def save_chunks_bulk(
+        self,
+        chunks: Union[List[DocumentChunk], DocumentChunkBatch]
+    ) -> List[DocumentChunk]:
+        """Save several document chunks in one round-trip."""
+        pass
+    
     @abstractmethod
     async def get_chunks_by_document_id(self, document_id: str) -> List[DocumentChunk]:
         """Get all chunks for a document."""
@@ -184,31 +192,51 @@ class Neo4jDocumentRepository(DocumentRepositoryInterface):
     async def save_chunk(self, chunk: DocumentChunk) -> DocumentChunk:
         """Save document chunk to Neo4j database."""
         
+        await self.save_chunks_bulk([chunk])
+        return chunk
+    
+    async def save_chunks_bulk(
+        self,
+        chunks: Union[List[DocumentChunk], DocumentChunkBatch]
+    ) -> List[DocumentChunk]:
+        """Save document chunks to Neo4j database with a single UNWIND query."""
+        
+        if isinstance(chunks, DocumentChunkBatch):
+            chunks = chunks.to_chunks()
+        
+        if not chunks:
+            return []
+        
         async with self.driver.session() as session:
             query = """
-            MATCH (d:Document {id: $document_id})
-            MERGE (c:DocumentChunk {id: $chunk_id})
-            SET c += $properties,
+            UNWIND $rows AS row
+            MATCH (d:Document {id: row.document_id})
+            MERGE (c:DocumentChunk {id: row.chunk_id})
+            SET c += row.properties,
                 c.updated_at = datetime()
             MERGE (d)-[:HAS_CHUNK]->(c)
-            RETURN c
+            RETURN c.id AS chunk_id
             """
             
-            properties = chunk.to_dict()
-            properties.pop('id', None)
+            rows = []
+            for chunk in chunks:
+                properties = chunk.to_dict()
+                properties.pop('id', None)
+                rows.append({
+                    'document_id': chunk.document_id,
+                    'chunk_id': chunk.id,
+                    'properties': properties
+                })
             
-            result = await session.run(query, {
-                'document_id': chunk.document_id,
-                'chunk_id': chunk.id,
-                'properties': properties
-            })
+            result = await session.run(query, {'rows': rows})
+            saved_ids = {record['chunk_id'] async for record in result}
             
-            record = await result.single()
-            if record:
-                self.logger.debug(f"Saved chunk: {chunk.id}")
-                return chunk
-            else:
-                raise RuntimeError(f"Failed to save chunk: {chunk.id}")
+            missing = [chunk.id for chunk in chunks if chunk.id not in saved_ids]
+            if missing:
+                raise RuntimeError(f"Failed to save chunks: {', '.join(missing)}")
+            
+            self.logger.debug(f"Saved {len(chunks)} chunks")
+            return chunks
     
     async def get_chunks_by_document_id(self, document_id: str) -> List[DocumentChunk]:
         """Get all chunks for a document ordered by chunk index."""
@@ -426,17 +454,30 @@ class InMemoryDocumentRepository(DocumentRepositoryInterface):
     
     async def save_chunk(self, chunk: DocumentChunk) -> DocumentChunk:
         """Save chunk to memory."""
-        if chunk.document_id not in self.chunks:
-            self.chunks[chunk.document_id] = []
+        await self.save_chunks_bulk([chunk])
+        return chunk
+    
+    async def save_chunks_bulk(
+        self,
+        chunks: Union[List[DocumentChunk], DocumentChunkBatch]
+    ) -> List[DocumentChunk]:
+        """Save chunks to memory."""
+        if isinstance(chunks, DocumentChunkBatch):
+            chunks = chunks.to_chunks()
         
-        # Remove existing chunk with same ID
-        self.chunks[chunk.document_id] = [
-            c for c in self.chunks[chunk.document_id] if c.id != chunk.id
-        ]
+        by_document: Dict[str, Dict[str, DocumentChunk]] = {}
+        for chunk in chunks:
+            by_document.setdefault(chunk.document_id, {})[chunk.id] = chunk
         
-        self.chunks[chunk.document_id].append(chunk)
-        self.logger.debug(f"Saved chunk to memory: {chunk.id}")
-        return chunk
+        for document_id, new_chunks in by_document.items():
+            # Remove existing chunks with the same IDs
+            self.chunks[document_id] = [
+                c for c in self.chunks.get(document_id, []) if c.id not in new_chunks
+            ]
+            self.chunks[document_id].extend(new_chunks.values())
+        
+        self.logger.debug(f"Saved {len(chunks)} chunks to memory")
+        return chunks
     
     async def get_chunks_by_document_id(self, document_id: str) -> List[DocumentChunk]:
         """Get chunks by document ID from memory."""
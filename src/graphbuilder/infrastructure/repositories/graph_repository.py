@@ -26,6 +26,11 @@ class GraphRepositoryInterface(ABC):
         """Save an entity to the graph."""
         pass
     
+    @abstractmethod
+    async def save_entities_bulk(self, entities: List[GraphEntity]) -> List[GraphEntity]:
+        """Save several entities to the graph in one round-trip."""
+        pass
+    
     @abstractmethod
     async def get_entity_by_id(self, entity_id: str) -> Optional[GraphEntity]:
         """Get entity by ID."""
@@ -111,66 +116,53 @@ class Neo4jGraphRepository(GraphRepositoryInterface):
     async def save_entity(self, entity: GraphEntity) -> GraphEntity:
         """Save entity to Neo4j graph database."""
         
+        await self.save_entities_bulk([entity])
+        return entity
+    
+    async def save_entities_bulk(self, entities: List[GraphEntity]) -> List[GraphEntity]:
+        """
+        Save entities to Neo4j graph database with a single UNWIND query.
+        
+        An entity with the same name and type as an existing node updates that
+        node and takes over its ID; otherwise a new node is created.
+        """
+        
+        if not entities:
+            return []
+        
         async with self.driver.session() as session:
-            # Check for existing entity with same name and type
-            existing_query = """
-            MATCH (e:Entity)
-            WHERE e.name = $name AND e.entity_type = $entity_type
-            RETURN e.id as existing_id
+            query = """
+            UNWIND $rows AS row
+            MERGE (e:Entity {name: row.name, entity_type: row.entity_type})
+            ON CREATE SET e.id = row.id,
+                e.content_hash = row.content_hash,
+                e.created_at = datetime(),
+                e.version = 1
+            ON MATCH SET e.version = e.version + 1
+            SET e += row.properties,
+                e.updated_at = datetime()
+            RETURN row.index AS index, e.id AS id
             """
             
-            result = await session.run(existing_query, {
-                'name': entity.name,
-                'entity_type': entity.entity_type.value
-            })
-            
-            existing_record = await result.single()
-            
-            if existing_record:
-                # Update existing entity
-                existing_id = existing_record['existing_id']
-                update_query = """
-                MATCH (e:Entity {id: $existing_id})
-                SET e += $properties,
-                    e.updated_at = datetime(),
-                    e.version = e.version + 1
-                RETURN e
-                """
-                
+            rows = []
+            for index, entity in enumerate(entities):
                 properties = entity.to_dict()
                 properties.pop('id', None)
-                
-                await session.run(update_query, {
-                    'existing_id': existing_id,
-                    'properties': properties
-                })
-                
-                entity.id = existing_id
-                self.logger.debug(f"Updated existing entity: {entity.id}")
-                
-            else:
-                # Create new entity
-                create_query = """
-                CREATE (e:Entity {id: $id})
-                SET e += $properties,
-                    e.created_at = datetime(),
-                    e.updated_at = datetime(),
-                    e.version = 1
-                RETURN e
-                """
-                
-                properties = entity.to_dict()
-                properties.pop('id', None)
-                properties['content_hash'] = entity.get_hash()
-                
-                await session.run(create_query, {
+                rows.append({
+                    'index': index,
                     'id': entity.id,
+                    'name': entity.name,
+                    'entity_type': entity.entity_type.value,
+                    'content_hash': entity.get_hash(),
                     'properties': properties
                 })
-                
-                self.logger.debug(f"Created new entity: {entity.id}")
+            
+            result = await session.run(query, {'rows': rows})
+            async for record in result:
+                entities[record['index']].id = record['id']
         
-        return entity
+        self.logger.debug(f"Saved {len(entities)} entities")
+        return entities
     
     async def get_entity_by_id(self, entity_id: str) -> Optional[GraphEntity]:
         """Get entity by ID from Neo4j database."""
@@ -543,10 +535,15 @@ class InMemoryGraphRepository(GraphRepositoryInterface):
     
     async def save_entity(self, entity: GraphEntity) -> GraphEntity:
         """Save entity to memory."""
-        self.entities[entity.id] = entity
-        self.logger.debug(f"Saved entity to memory: {entity.id}")
+        await self.save_entities_bulk([entity])
         return entity
     
+    async def save_entities_bulk(self, entities: List[GraphEntity]) -> List[GraphEntity]:
+        """Save entities to memory."""
+        self.entities.update((entity.id, entity) for entity in entities)
+        self.logger.debug(f"Saved {len(entities)} entities to memory")
+        return entities
+    
     async def get_entity_by_id(self, entity_id: str) -> Optional[GraphEntity]:
         """Get entity by ID from memory."""
         return self.entities.get(entity_id)
@@ -9,6 +9,7 @@ Original File: llm.py
 New Location: src/graphbuilder/infrastructure/services/legacy_llm.py
 """
 
+import functools
 import logging
 from graphbuilder.core.utils.constants import MODEL_VERSIONS
 from langchain_openai import AzureChatOpenAI
@@ -43,6 +44,7 @@ def generate_graphDocuments(model: str, graph: Neo4jGraph, chunkId_chunkDoc_list
     return graph_documents
 
 
+@functools.lru_cache(maxsize=4)
 def get_llm(model_version = "azure_ai_gpt_4o"):
     """Retrieve the specified language model based on the model name."""
     env_key = "LLM_MODEL_CONFIG_" + model_version
@@ -86,32 +88,50 @@ def get_combined_chunks(chunkId_chunkDoc_list):
         for i in range(0, len(chunkId_chunkDoc_list), chunks_to_combine)
     ]
 
+    # Chunks pooled from several files carry their file, since equal chunk
+    # text in two files gives the same chunk id
+    combined_chunks_files = [
+        [
+            document.get("file_name")
+            for document in chunkId_chunkDoc_list[i: i + chunks_to_combine]
+        ]
+        for i in range(0, len(chunkId_chunkDoc_list), chunks_to_combine)
+    ]
+
     for i in range(len(combined_chunks_page_content)):
         combined_chunk_document_list.append(
             Document(
                 page_content=combined_chunks_page_content[i],
-                metadata={"combined_chunk_ids": combined_chunks_ids[i]},
+                metadata={"combined_chunk_ids": combined_chunks_ids[i], "combined_chunk_files": combined_chunks_files[i]},
             )
         )
     return combined_chunk_document_list
 
 
-def get_graph_document_list(
-        llm, combined_chunk_document_list, allowedNodes, allowedRelationship, use_function=True
-):
-    futures = []
-    graph_document_list = []
+@functools.lru_cache(maxsize=8)
+def get_llm_transformer(model, allowedNodes: tuple, allowedRelationship: tuple, use_function=True):
+    """
+    Build the graph transformer for a model and schema once and reuse it for
+    every batch of a file, instead of recreating the client, prompt and
+    structured-output chain per batch.
+    """
+    llm, model_name = get_llm(model)
     if not use_function:
         node_properties = False
     else:
         node_properties = ["description"]
-    llm_transformer = LLMGraphTransformer(
+    return LLMGraphTransformer(
         llm=llm,
         node_properties=node_properties,
-        allowed_nodes=allowedNodes,
-        allowed_relationships=allowedRelationship,
+        allowed_nodes=list(allowedNodes),
+        allowed_relationships=list(allowedRelationship),
         use_function_call=use_function
     )
+
+
+def get_graph_document_list(llm_transformer, combined_chunk_document_list):
+    futures = []
+    graph_document_list = []
     with ThreadPoolExecutor(max_workers=10) as executor:
         for chunk in combined_chunk_document_list:
             chunk_doc = Document(
@@ -129,9 +149,7 @@ def get_graph_document_list(
 
 
 def get_graph_from_llm(model, chunkId_chunkDoc_list, allowedNodes, allowedRelationship):
-    llm, model_name = get_llm(model)
+    llm_transformer = get_llm_transformer(model, tuple(allowedNodes), tuple(allowedRelationship))
     combined_chunk_document_list = get_combined_chunks(chunkId_chunkDoc_list)
-    graph_document_list = get_graph_document_list(
-        llm, combined_chunk_document_list, allowedNodes, allowedRelationship
-    )
+    graph_document_list = get_graph_document_list(llm_transformer, combined_chunk_document_list)
     return graph_document_list
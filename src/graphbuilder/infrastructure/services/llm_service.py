@@ -6,9 +6,11 @@ prompt engineering, response validation, and multi-provider support.
 """
 
 import asyncio
+import hashlib
 import logging
 import json
-from typing import Dict, List, Optional, Any, Union
+import time
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timezone
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
@@ -18,10 +20,24 @@ from ...domain.models.processing_models import ProcessingResult
 from ...domain.models.graph_models import EntityType, RelationshipType
 from ..config.settings import GraphBuilderConfig, LLMProvider
 
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Completion budget used when LLM_MAX_TOKENS is unset; most chat models
+# reject a larger max_tokens
+DEFAULT_COMPLETION_TOKEN_LIMIT = 4096
+
+# Completion tokens reserved per chunk in a batched entity extraction call
+BATCH_ENTITY_TOKENS_PER_CHUNK = 500
+
 
 class PromptType(Enum):
     """Types of prompts for different extraction tasks."""
     ENTITY_EXTRACTION = "entity_extraction"
+    BATCH_ENTITY_EXTRACTION = "batch_entity_extraction"
     RELATIONSHIP_EXTRACTION = "relationship_extraction"
     CONTENT_CLASSIFICATION = "content_classification"
     SUMMARIZATION = "summarization"
@@ -86,6 +102,27 @@ class LLMServiceInterface(ABC):
         """Extract entities from content."""
         pass
     
+    @abstractmethod
+    async def extract_entities_batch(
+        self,
+        contents: List[str],
+        config: Dict[str, Any] = None
+    ) -> ProcessingResult:
+        """Extract entities from several contents with one LLM call."""
+        pass
+    
+    def partition_by_cache(
+        self,
+        contents: List[str],
+        config: Dict[str, Any] = None
+    ) -> Tuple[Dict[int, List[Dict[str, Any]]], List[int]]:
+        """Split contents into cached entity lists by index and indices still to extract."""
+        return {}, list(range(len(contents)))
+    
+    def max_entity_batch_size(self, config: Dict[str, Any] = None) -> int:
+        """Largest number of contents to pass to extract_entities_batch at once."""
+        return max(1, config.get("llm_batch_size", 8) if config else 8)
+    
     @abstractmethod
     async def extract_relationships(
         self,
@@ -135,11 +172,25 @@ class AdvancedLLMService(LLMServiceInterface):
         # Response validators
         self.validators = {
             PromptType.ENTITY_EXTRACTION: self._validate_entity_response,
+            PromptType.BATCH_ENTITY_EXTRACTION: self._validate_batch_entity_response,
             PromptType.RELATIONSHIP_EXTRACTION: self._validate_relationship_response,
             PromptType.CONTENT_CLASSIFICATION: self._validate_classification_response,
             PromptType.SUMMARIZATION: self._validate_summary_response
         }
     
+    def max_entity_batch_size(self, config: Dict[str, Any] = None) -> int:
+        """Largest batch whose per-chunk completion budgets fit under the model's limit."""
+        
+        tokens_per_chunk = config.get("batch_tokens_per_chunk", BATCH_ENTITY_TOKENS_PER_CHUNK) if config else BATCH_ENTITY_TOKENS_PER_CHUNK
+        return max(1, min(
+            super().max_entity_batch_size(config),
+            self._completion_token_limit() // tokens_per_chunk
+        ))
+    
+    def _completion_token_limit(self) -> int:
+        """Largest max_tokens a single request may ask for."""
+        return self.config.llm.max_tokens or DEFAULT_COMPLETION_TOKEN_LIMIT
+    
     def _initialize_client(self):
         """Initialize LLM client based on configuration."""
         
@@ -205,6 +256,38 @@ RESPOND WITH VALID JSON:
         "processing_notes": "Any relevant notes"
     }}
 }}
+""",
+            
+            PromptType.BATCH_ENTITY_EXTRACTION: """
+You are an expert knowledge graph analyst. Extract entities from each of the numbered text chunks below with high precision.
+
+INSTRUCTIONS:
+1. Treat every <chunk id=N> independently and extract its entities (people, organizations, locations, products, technologies, concepts, events)
+2. For each entity, provide: name, type, description, and key properties
+3. Ensure entities are specific and meaningful (avoid generic terms)
+4. Include confidence scores (0.0-1.0) for each entity
+5. Return an entry for every chunk id, using an empty list if a chunk has no entities
+
+ENTITY TYPES: {entity_types}
+
+CHUNKS TO ANALYZE:
+{chunks}
+
+RESPOND WITH VALID JSON, KEYED BY CHUNK ID:
+{{
+    "entities_by_index": {{
+        "0": [
+            {{
+                "name": "Entity Name",
+                "type": "ENTITY_TYPE",
+                "description": "Brief description",
+                "properties": {{"key": "value"}},
+                "confidence": 0.95,
+                "mentions": ["mention1", "mention2"]
+            }}
+        ]
+    }}
+}}
 """,
             
             PromptType.RELATIONSHIP_EXTRACTION: """
@@ -374,6 +457,88 @@ RESPOND WITH VALID JSON:
                 errors=[str(e)]
             )
     
+    async def extract_entities_batch(
+        self,
+        contents: List[str],
+        config: Dict[str, Any] = None
+    ) -> ProcessingResult:
+        """
+        Extract entities from several chunks with one LLM call.
+        
+        The chunks are numbered in a single prompt and the response is keyed
+        by chunk number, so N chunks cost one round-trip instead of N. On
+        success, data["entities_by_index"] holds one entity list per input, in
+        input order. A malformed response fails the whole batch so the caller
+        can fall back to extract_entities per chunk.
+        """
+        
+        start_time = datetime.now(timezone.utc)
+        
+        try:
+            # Prepare entity types for prompt
+            entity_types = [et.value for et in EntityType]
+            
+            chunks = "\n".join(
+                f"<chunk id={index}>\n{content[:4000]}\n</chunk id={index}>"  # Limit content length per chunk
+                for index, content in enumerate(contents)
+            )
+            prompt = self.prompts[PromptType.BATCH_ENTITY_EXTRACTION].format(
+                entity_types=", ".join(entity_types),
+                chunks=chunks
+            )
+            
+            # The response lists entities for every chunk, so its budget grows with
+            # the batch, but never past the model's completion limit; see
+            # max_entity_batch_size for sizing batches to fit under it
+            tokens_per_chunk = config.get("batch_tokens_per_chunk", BATCH_ENTITY_TOKENS_PER_CHUNK) if config else BATCH_ENTITY_TOKENS_PER_CHUNK
+            llm_request = LLMRequest(
+                prompt=prompt,
+                content="\n".join(contents),
+                prompt_type=PromptType.BATCH_ENTITY_EXTRACTION,
+                temperature=config.get("temperature", 0.1) if config else 0.1,
+                max_tokens=min(tokens_per_chunk * len(contents), self._completion_token_limit())
+            )
+            
+            # Execute LLM call
+            llm_response = await self._execute_llm_call(llm_request)
+            
+            # Parse and validate response
+            batch_data = await self._parse_json_response(llm_response.content)
+            validation_result = self._validate_batch_entity_response(batch_data, len(contents))
+            
+            if not validation_result.success:
+                return validation_result
+            
+            entities_by_index = [batch_data["entities_by_index"][str(index)] for index in range(len(contents))]
+            total_entities = sum(len(entities) for entities in entities_by_index)
+            
+            # Calculate processing metrics
+            processing_time = (datetime.now(timezone.utc) - start_time).total_seconds()
+            
+            result = ProcessingResult(
+                success=True,
+                message=f"Extracted {total_entities} entities from {len(contents)} chunks",
+                data={
+                    "entities_by_index": entities_by_index,
+                    "llm_response": llm_response.to_dict()
+                },
+                processing_time=processing_time
+            )
+            
+            result.add_metric("entities_extracted", total_entities)
+            result.add_metric("tokens_used", llm_response.total_tokens)
+            result.add_metric("processing_time", processing_time)
+            
+            return result
+            
+        except Exception as e:
+            self.logger.error(f"Batch entity extraction error: {str(e)}", exc_info=True)
+            return ProcessingResult(
+                success=False,
+                message=f"Batch entity extraction failed: {str(e)}",
+                errors=[str(e)]
+            )
+    
     async def extract_relationships(
         self,
         content: str,
@@ -674,6 +839,38 @@ RESPOND WITH VALID JSON:
         
         return ProcessingResult(success=True, message="Entity response validation passed")
     
+    def _validate_batch_entity_response(self, data: Dict[str, Any], expected_count: Optional[int] = None) -> ProcessingResult:
+        """Validate batch entity extraction response."""
+        
+        entities_by_index = data.get("entities_by_index")
+        if not isinstance(entities_by_index, dict):
+            return ProcessingResult(
+                success=False,
+                message="Missing or invalid 'entities_by_index' field in response",
+                errors=["Response validation failed"]
+            )
+        
+        if expected_count is not None:
+            missing = [index for index in range(expected_count) if str(index) not in entities_by_index]
+            if missing:
+                return ProcessingResult(
+                    success=False,
+                    message=f"Response is missing chunks: {missing}",
+                    errors=["Response validation failed"]
+                )
+        
+        # Each chunk's list must pass the single-chunk validation
+        for index, entities in entities_by_index.items():
+            chunk_result = self._validate_entity_response({"entities": entities})
+            if not chunk_result.success:
+                return ProcessingResult(
+                    success=False,
+                    message=f"Chunk {index}: {chunk_result.message}",
+                    errors=chunk_result.errors
+                )
+        
+        return ProcessingResult(success=True, message="Batch entity response validation passed")
+    
     def _validate_relationship_response(self, data: Dict[str, Any]) -> ProcessingResult:
         """Validate relationship extraction response."""
         
@@ -737,7 +934,196 @@ RESPOND WITH VALID JSON:
         return ProcessingResult(success=True, message="Summary response validation passed")
 
 
+class LLMResponseCache:
+    """
+    Key-value store for parsed LLM responses.
+    
+    Uses diskcache when installed so entries survive restarts, otherwise a
+    bounded in-process dictionary that evicts its oldest entries first.
+    """
+    
+    def __init__(self, directory: str, ttl: Optional[int] = None, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._disk_cache = diskcache.Cache(directory) if DISKCACHE_AVAILABLE else None
+        self._memory_cache: Dict[str, Tuple[Optional[float], Any]] = {}
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        
+        if self._disk_cache is not None:
+            return self._disk_cache.get(key)
+        
+        entry = self._memory_cache.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._memory_cache[key]
+            return None
+        
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key for the configured TTL."""
+        
+        if self._disk_cache is not None:
+            self._disk_cache.set(key, value, expire=self.ttl)
+            return
+        
+        if key not in self._memory_cache and len(self._memory_cache) >= self.max_entries:
+            self._memory_cache.pop(next(iter(self._memory_cache)))
+        
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        self._memory_cache[key] = (expires_at, value)
+
+
+class CachedLLMService(LLMServiceInterface):
+    """
+    LLM service wrapper that reuses entity extraction results for unchanged content.
+    
+    Entries are keyed by a BLAKE2b digest of the content, the prompt version,
+    the provider and model, the entity types and the temperature, so
+    re-processing a document or retrying after an error skips the LLM for
+    chunks it has already seen, while a change of model or extraction settings
+    does not serve stale entities. Bump LLM_PROMPT_VERSION to invalidate
+    entries after editing the prompt templates.
+    """
+    
+    def __init__(self, service: LLMServiceInterface, cache: LLMResponseCache, prompt_version: str, model_id: str = ""):
+        self.service = service
+        self.cache = cache
+        self.prompt_version = prompt_version
+        self.model_id = model_id
+        self.entity_types = ",".join(et.value for et in EntityType)
+        self.logger = logging.getLogger(self.__class__.__name__)
+    
+    def _cache_key(self, content: str, config: Dict[str, Any] = None) -> str:
+        temperature = config.get("temperature", 0.1) if config else 0.1
+        settings = f"{self.model_id}|{self.entity_types}|{temperature}"
+        settings_digest = hashlib.blake2b(settings.encode("utf-8"), digest_size=8).hexdigest()
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{PromptType.ENTITY_EXTRACTION.value}:{digest}:{self.prompt_version}:{settings_digest}"
+    
+    def partition_by_cache(
+        self,
+        contents: List[str],
+        config: Dict[str, Any] = None
+    ) -> Tuple[Dict[int, List[Dict[str, Any]]], List[int]]:
+        """Split contents into cached entity lists by index and indices still to extract."""
+        
+        cached: Dict[int, List[Dict[str, Any]]] = {}
+        uncached: List[int] = []
+        
+        for index, content in enumerate(contents):
+            entry = self.cache.get(self._cache_key(content, config))
+            if entry is None:
+                uncached.append(index)
+            else:
+                cached[index] = entry["entities"]
+        
+        return cached, uncached
+    
+    def max_entity_batch_size(self, config: Dict[str, Any] = None) -> int:
+        """Largest number of contents to pass to extract_entities_batch at once."""
+        return self.service.max_entity_batch_size(config)
+    
+    async def extract_entities(
+        self,
+        content: str,
+        config: Dict[str, Any] = None
+    ) -> ProcessingResult:
+        """Extract entities, answering from the cache when the content is unchanged."""
+        
+        key = self._cache_key(content, config)
+        entry = self.cache.get(key)
+        
+        if entry is not None:
+            return ProcessingResult(
+                success=True,
+                message=f"Loaded {len(entry['entities'])} entities from cache",
+                data={
+                    "entities": entry["entities"],
+                    "metadata": entry["metadata"],
+                    "cached": True
+                }
+            )
+        
+        result = await self.service.extract_entities(content, config)
+        if result.success:
+            self.cache.set(key, {
+                "entities": result.data.get("entities", []),
+                "metadata": result.data.get("metadata", {})
+            })
+        
+        return result
+    
+    async def extract_entities_batch(
+        self,
+        contents: List[str],
+        config: Dict[str, Any] = None
+    ) -> ProcessingResult:
+        """Extract entities for several contents, sending only cache misses to the LLM."""
+        
+        cached, uncached = self.partition_by_cache(contents, config)
+        
+        if uncached:
+            result = await self.service.extract_entities_batch([contents[i] for i in uncached], config)
+            if not result.success:
+                return result
+            
+            for index, entities in zip(uncached, result.data["entities_by_index"]):
+                self.cache.set(self._cache_key(contents[index], config), {"entities": entities, "metadata": {}})
+                cached[index] = entities
+        
+        entities_by_index = [cached[index] for index in range(len(contents))]
+        
+        return ProcessingResult(
+            success=True,
+            message=f"Extracted {sum(len(entities) for entities in entities_by_index)} entities from {len(contents)} chunks",
+            data={
+                "entities_by_index": entities_by_index,
+                "cached_chunks": len(contents) - len(uncached)
+            }
+        )
+    
+    async def extract_relationships(
+        self,
+        content: str,
+        entities: List[Dict[str, Any]],
+        config: Dict[str, Any] = None
+    ) -> ProcessingResult:
+        """Extract relationships between entities."""
+        return await self.service.extract_relationships(content, entities, config)
+    
+    async def classify_content(
+        self,
+        content: str,
+        categories: List[str],
+        config: Dict[str, Any] = None
+    ) -> ProcessingResult:
+        """Classify content into categories."""
+        return await self.service.classify_content(content, categories, config)
+    
+    async def summarize_content(
+        self,
+        content: str,
+        config: Dict[str, Any] = None
+    ) -> ProcessingResult:
+        """Generate content summary."""
+        return await self.service.summarize_content(content, config)
+
+
 # Factory function for creating LLM service
 def create_llm_service(config: GraphBuilderConfig) -> LLMServiceInterface:
     """Create LLM service based on configuration."""
-    return AdvancedLLMService(config)
\ No newline at end of file
+    
+    service = AdvancedLLMService(config)
+    
+    if config.llm.response_cache_enabled:
+        cache = LLMResponseCache(config.llm.response_cache_directory, config.llm.response_cache_ttl)
+        model_id = f"{config.llm.provider}:{config.llm.model_name}"
+        return CachedLLMService(service, cache, config.llm.prompt_version, model_id)
+    
+    return service
\ No newline at end of file